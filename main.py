@@ -5,11 +5,12 @@ import importlib
 import socket
 import time
 from datetime import datetime
-from utils import LOGGER
+from utils import LOGGER, ARTIFACTS, lifespan
 
 app = FastAPI(
     title="A360",
-    description="A Project Made To Centralize Various APIs 📖 No Authorization Needed, All Endpoints Included :"
+    description="A Project Made To Centralize Various APIs 📖 No Authorization Needed, All Endpoints Included :",
+    lifespan=lifespan
 )
 
 start_time = time.time()
@@ -92,6 +93,7 @@ async def health_api():
         "Api Uptime": get_uptime(),
         "Total Endpoints": count_endpoints(),
         "Total Plugins": count_plugins(),
+        "Artifact Storage": ARTIFACTS.metrics(),
         "Last Checked": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
     }
 
@@ -2,13 +2,24 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 import requests
 from bs4 import BeautifulSoup
+from collections import deque
+import asyncio
+import os
 import re
 import uuid
 import time
 import json
 from datetime import datetime
+from utils import LOGGER, on_shutdown, on_startup
 
 router = APIRouter(prefix="/ai")
+GEM_POOL_SIZE = int(os.getenv("GEM_POOL_SIZE", "2"))
+GEM_SESSION_MAX_AGE = 1800
+GEM_SESSION_MAX_USES = 100
+GEM_SESSION_MAX_FAILURES = 2
+GEM_REFRESH_INTERVAL = 60
+GEM_REFRESH_MARGIN = 120
+GEM_STALE_STATUSES = frozenset({400, 401, 403})
 
 def extract_snlm0e_token(html):
     patterns = [
@@ -121,6 +132,145 @@ def scrape_fresh_session_gemini():
     except:
         return None
 
+class GeminiSession:
+    def __init__(self, data):
+        self.data = data
+        self.created = time.monotonic()
+        self.uses = 0
+        self.failures = 0
+
+    def healthy(self, margin=0) -> bool:
+        return (
+            self.failures < GEM_SESSION_MAX_FAILURES
+            and self.uses < GEM_SESSION_MAX_USES
+            and time.monotonic() - self.created < GEM_SESSION_MAX_AGE - margin
+        )
+
+    def next_reqid(self):
+        self.uses += 1
+        self.data["reqid"] += 100000
+        return self.data["reqid"]
+
+    def close(self):
+        try:
+            self.data["session"].close()
+        except Exception:
+            pass
+
+class GeminiSessionPool:
+    def __init__(self, size):
+        self.size = size
+        self.idle = deque()
+        self.in_use = 0
+        self.loop = None
+        self.refresher = None
+        self.scraped = 0
+        self.scrape_failures = 0
+        self.reused = 0
+        self.cold = 0
+        self.retired = 0
+        self.stale = 0
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.refresher = None
+        if self.refresher is None or self.refresher.done():
+            self.refresher = loop.create_task(self._refresh_loop())
+
+    async def _scrape(self):
+        started = time.monotonic()
+        data = await asyncio.to_thread(scrape_fresh_session_gemini)
+        if not data:
+            self.scrape_failures += 1
+            LOGGER.warning("Failed to scrape a Gemini web session")
+            return None
+        self.scraped += 1
+        LOGGER.info(f"Scraped Gemini web session in {time.monotonic() - started:.2f}s")
+        return GeminiSession(data)
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                LOGGER.warning(f"Gemini session refresh failed: {str(e)}")
+            await asyncio.sleep(GEM_REFRESH_INTERVAL)
+
+    async def refresh(self):
+        for session in list(self.idle):
+            if not session.healthy(GEM_REFRESH_MARGIN):
+                self.idle.remove(session)
+                self._retire(session)
+        while len(self.idle) + self.in_use < self.size:
+            session = await self._scrape()
+            if session is None:
+                break
+            self.idle.append(session)
+
+    async def acquire(self):
+        self.start()
+        while self.idle:
+            session = self.idle.popleft()
+            if session.healthy():
+                self.reused += 1
+                self.in_use += 1
+                return session
+            self._retire(session)
+        self.cold += 1
+        session = await self._scrape()
+        if session is not None:
+            self.in_use += 1
+        return session
+
+    def release(self, session, ok):
+        self.in_use -= 1
+        session.failures = 0 if ok else session.failures + 1
+        if session.healthy() and len(self.idle) < self.size:
+            self.idle.append(session)
+        else:
+            self._retire(session)
+
+    def discard(self, session, stale=True):
+        self.in_use -= 1
+        if stale:
+            self.stale += 1
+        self._retire(session)
+
+    def discard_when_done(self, future, session):
+        def done(future):
+            if not future.cancelled():
+                future.exception()
+            self.discard(session, stale=False)
+        future.add_done_callback(done)
+
+    def _retire(self, session):
+        self.retired += 1
+        session.close()
+
+    async def close(self):
+        if self.refresher is not None:
+            self.refresher.cancel()
+            self.refresher = None
+        while self.idle:
+            self._retire(self.idle.popleft())
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "idle": len(self.idle),
+            "in_use": self.in_use,
+            "scraped": self.scraped,
+            "scrape_failures": self.scrape_failures,
+            "reused": self.reused,
+            "cold": self.cold,
+            "retired": self.retired,
+            "stale": self.stale
+        }
+
+GEM_SESSIONS = GeminiSessionPool(GEM_POOL_SIZE)
+
 def build_payload_gemini(prompt, snlm0e):
     prompt_esc = prompt.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
     session_id = uuid.uuid4().hex
@@ -193,6 +343,21 @@ def build_payload_gemini(prompt, snlm0e):
     esc_payload = payload_str.replace("\\", "\\\\").replace('"', '\\"')
     return {"f.req": f'[null,"{esc_payload}"]', "": ""}
 
+def send_prompt_gemini(session, prompt):
+    data = session.data
+    cookie_str = "; ".join(f"{k}={v}" for k, v in data["cookies"].items())
+    url = f"https://gemini.google.com/_/BardChatUi/data/assistant.lamda.BardFrontendService/StreamGenerate?bl={data['bl']}&f.sid={data['fsid']}&hl=en-US&_reqid={session.next_reqid()}&rt=c"
+    payload = build_payload_gemini(prompt, data["snlm0e"])
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+        "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
+        "origin": "https://gemini.google.com",
+        "referer": "https://gemini.google.com/",
+        "x-same-domain": "1",
+        "Cookie": cookie_str
+    }
+    return data["session"].post(url, data=payload, headers=headers, timeout=60)
+
 def parse_streaming_response_gemini(text):
     full = ""
     for line in text.strip().split("\n"):
@@ -322,29 +487,43 @@ async def gem(prompt: str = ""):
         })
     
     start_time = time.time()
-    data = scrape_fresh_session_gemini()
-    
-    if not data:
-        return JSONResponse(status_code=500, content={
-            "success": False,
-            "error": "Failed to establish session with Gemini",
-            "api_dev": "@ISmartCoder"
-        })
-    
-    cookie_str = "; ".join(f"{k}={v}" for k, v in data["cookies"].items())
-    url = f"https://gemini.google.com/_/BardChatUi/data/assistant.lamda.BardFrontendService/StreamGenerate?bl={data['bl']}&f.sid={data['fsid']}&hl=en-US&_reqid={data['reqid']}&rt=c"
-    payload = build_payload_gemini(prompt, data["snlm0e"])
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-        "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-        "origin": "https://gemini.google.com",
-        "referer": "https://gemini.google.com/",
-        "x-same-domain": "1",
-        "Cookie": cookie_str
-    }
+    for attempt in range(2):
+        session = await GEM_SESSIONS.acquire()
+        
+        if not session:
+            return JSONResponse(status_code=500, content={
+                "success": False,
+                "error": "Failed to establish session with Gemini",
+                "api_dev": "@ISmartCoder"
+            })
+        
+        outcome = None
+        request = asyncio.ensure_future(asyncio.to_thread(send_prompt_gemini, session, prompt))
+        try:
+            resp = await asyncio.shield(request)
+            if resp.status_code in GEM_STALE_STATUSES and attempt == 0:
+                LOGGER.warning(f"Gemini web session rejected with HTTP {resp.status_code}, retrying with a fresh session")
+                outcome = "stale"
+                continue
+            result = parse_streaming_response_gemini(resp.text) if resp.status_code == 200 else None
+            outcome = "ok" if result else "failed"
+        except Exception as e:
+            LOGGER.error(f"Gemini web request failed: {str(e)}")
+            return JSONResponse(status_code=500, content={
+                "success": False,
+                "error": "Gemini request failed",
+                "api_dev": "@ISmartCoder"
+            })
+        finally:
+            if outcome in ("ok", "failed"):
+                GEM_SESSIONS.release(session, outcome == "ok")
+            elif request.done():
+                GEM_SESSIONS.discard(session, stale=outcome == "stale")
+            else:
+                GEM_SESSIONS.discard_when_done(request, session)
+        break
     
     try:
-        resp = data["session"].post(url, data=payload, headers=headers, timeout=60)
         if resp.status_code != 200:
             return JSONResponse(status_code=500, content={
                 "success": False,
@@ -352,7 +531,6 @@ async def gem(prompt: str = ""):
                 "api_dev": "@ISmartCoder"
             })
         
-        result = parse_streaming_response_gemini(resp.text)
         end_time = time.time()
         response_time = round(end_time - start_time, 2)
         
@@ -383,6 +561,22 @@ async def gem(prompt: str = ""):
             "api_dev": "@ISmartCoder"
         })
 
+@router.get("/gem/stats")
+async def gem_stats():
+    return JSONResponse(content={
+        "success": True,
+        "sessions": GEM_SESSIONS.stats(),
+        "api_dev": "@ISmartCoder"
+    })
+
+@on_startup
+async def warm_gem_sessions():
+    GEM_SESSIONS.start()
+
+@on_shutdown
+async def close_gem_sessions():
+    await GEM_SESSIONS.close()
+
 @router.get("/pplxty")
 async def pplxty(prompt: str = "", mode: str = "concise", model: str = "turbo", search_focus: str = "internet"):
     if not prompt:
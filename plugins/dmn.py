@@ -1,29 +1,32 @@
 from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import JSONResponse
-import cloudscraper
 from bs4 import BeautifulSoup
 from collections import OrderedDict
+import asyncio
 import time
 
-from utils import LOGGER
+from utils import CLOUDSCRAPER_AVAILABLE, LOGGER, ScraperPool, on_shutdown, on_startup
 
 router = APIRouter(prefix="/dmn")
 
 class WhoisChecker:
     def __init__(self):
         LOGGER.info("Initializing WhoisChecker...")
-        self.scraper = cloudscraper.create_scraper(
+        self.scrapers = ScraperPool(
+            "whois",
             browser={
                 'browser': 'chrome',
                 'platform': 'android',
                 'mobile': True
-            }
+            },
+            size=4,
+            warm=2
         )
         self.base_url = "https://www.whois.com"
-        self.session_cookie = None
+        self.session_lock = None
         LOGGER.info("WhoisChecker initialized successfully")
         
-    def get_session(self):
+    async def get_session(self):
         LOGGER.info("Getting new session...")
         headers = {
             'User-Agent': 'Mozilla/5.0 (Linux; Android 15; V2434 Build/AP3A.240905.015.A2_NN_V000L1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.7499.192 Mobile Safari/537.36',
@@ -33,21 +36,28 @@ class WhoisChecker:
         }
         
         try:
-            response = self.scraper.get(f"{self.base_url}/whois/", headers=headers)
+            response = await self.scrapers.get(f"{self.base_url}/whois/", headers=headers, timeout=15)
             if 'whoissid' in response.cookies:
-                self.session_cookie = response.cookies['whoissid']
                 LOGGER.info("Session cookie obtained successfully")
             return True
         except Exception as e:
             LOGGER.error(f"Session error: {e}")
             return False
     
-    def check_domain(self, domain):
+    async def ensure_session(self):
+        if self.scrapers.has_cookies(self.base_url):
+            return
+        if self.session_lock is None:
+            self.session_lock = asyncio.Lock()
+        async with self.session_lock:
+            if not self.scrapers.has_cookies(self.base_url):
+                LOGGER.info("No session cookie found, creating new session...")
+                await self.get_session()
+    
+    async def check_domain(self, domain):
         LOGGER.info(f"Checking domain: {domain}")
         
-        if not self.session_cookie:
-            LOGGER.info("No session cookie found, creating new session...")
-            self.get_session()
+        await self.ensure_session()
         
         url = f"{self.base_url}/whois/{domain}"
         
@@ -61,11 +71,11 @@ class WhoisChecker:
         
         try:
             LOGGER.info(f"Sending request to: {url}")
-            response = self.scraper.get(url, headers=headers)
+            response = await self.scrapers.get(url, headers=headers, timeout=20)
             LOGGER.info(f"Response status code: {response.status_code}")
             
             if response.status_code == 200:
-                result = self.parse_whois_data(response.text, domain)
+                result = await asyncio.to_thread(self.parse_whois_data, response.text, domain)
                 LOGGER.info(f"Successfully parsed data for {domain}")
                 return result
             else:
@@ -131,6 +141,14 @@ class WhoisChecker:
 
 checker = WhoisChecker()
 
+@on_startup
+async def warm_whois_scrapers():
+    await checker.scrapers.warm()
+
+@on_shutdown
+async def close_whois_scrapers():
+    await checker.scrapers.close()
+
 @router.get("")
 async def whois_domain(domain: str = Query(..., description="Domain name to lookup")):
     start_time = time.time()
@@ -145,9 +163,13 @@ async def whois_domain(domain: str = Query(..., description="Domain name to look
     domain = domain.strip().lower()
     LOGGER.info(f"Processing domain: {domain}")
     
+    if not CLOUDSCRAPER_AVAILABLE:
+        LOGGER.error("Cloudscraper not installed - whois lookups unavailable")
+        raise HTTPException(status_code=503, detail="Whois lookups are unavailable: cloudscraper is not installed")
+    
     try:
         LOGGER.info("Calling WhoisChecker...")
-        result = checker.check_domain(domain)
+        result = await checker.check_domain(domain)
         
         time_taken = f"{time.time() - start_time:.2f}s"
         
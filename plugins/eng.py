@@ -2,15 +2,64 @@
 #Updates Channel @TheSmartDev 
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
-import requests
+from pydantic import BaseModel
+from typing import List
+from urllib.parse import quote
+import aiohttp
+import asyncio
+import os
 import re
 import json
-from utils import LOGGER
+from utils import LOGGER, GeminiClient, GeminiError, SharedSession, SingleFlight, TieredCache, on_shutdown, on_startup
 from config import GEMINI_API_KEY
 
 router = APIRouter(prefix="/eng")
-GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+GEMINI = GeminiClient(GEMINI_API_KEY, model="gemini-2.0-flash")
 DICTIONARY_API_URL = "https://api.dictionaryapi.dev/api/v2/entries/en/"
+DATAMUSE_API_URL = "https://api.datamuse.com/words"
+ENG_HTTP = SharedSession(limit_per_host=10, timeout=10)
+ENG_CACHE_DIR = os.getenv("ENG_CACHE_DIR", "/tmp/eng_cache")
+LOOKUP_CACHE = TieredCache(os.path.join(ENG_CACHE_DIR, "lookups.db"), name="eng lookup", max_entries=8192)
+LOOKUP_FLIGHTS = SingleFlight()
+LOOKUP_TTL = {
+    "spl": 30 * 86400,
+    "syn": 30 * 86400,
+    "ant": 30 * 86400,
+    "prn": 7 * 86400
+}
+LOOKUP_MISS_TTL = 86400
+WARMUP_FILE = os.getenv("ENG_WARMUP_FILE")
+WARMUP_CONCURRENCY = 4
+WARMUP_KINDS = ("syn", "ant", "prn")
+WARMUP_MAX_TASKS = 2
+WARMUP_TASKS = set()
+BATCH_MAX_WORDS = 1000
+BATCH_CONCURRENCY = 8
+SPELL_BATCH_SIZE = 100
+SPELL_INSTRUCTION = "You are Smart Spell Checker. Your sole purpose is to check the spelling of a single input word and return only the correctly spelled word. If the input is already correct, return it unchanged. Do not provide explanations, suggestions, or additional text. Do not process sentences or multiple words."
+SPELL_BATCH_INSTRUCTION = "You are Smart Spell Checker. The input is a JSON array of words. For every word return the correctly spelled word, or the word unchanged if it is already correct. Respond only with a JSON array of objects holding the input word exactly as given in \"word\" and the corrected spelling in \"correction\". Do not provide explanations or additional text."
+SPELL_BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "word": {"type": "STRING"},
+            "correction": {"type": "STRING"}
+        },
+        "required": ["word", "correction"]
+    }
+}
+
+class LookupNotFound(Exception):
+    pass
+
+class WarmupRequest(BaseModel):
+    words: List[str]
+    kinds: List[str] = ["syn", "ant", "prn"]
+
+class BatchLookupRequest(BaseModel):
+    words: List[str]
+    kinds: List[str] = ["spl"]
 
 def infer_syllables(phonetic):
     if not phonetic or phonetic == "/unknown/":
@@ -57,89 +106,235 @@ def infer_phonemes(phonetic):
         phonemes.append(f"/{current}/")
     return ", ".join(set(phonemes)) or "/unknown/"
 
-def fetch_dictionary_data(word):
-    try:
-        response = requests.get(DICTIONARY_API_URL + word, headers={"Content-Type": "application/json; charset=UTF-8"}, timeout=10)
-        if response.status_code != 200 or not response.text:
-            LOGGER.error(f"Dictionary API returned status {response.status_code} for word {word}")
-            return None
-        data = response.json()
-        if not data or not isinstance(data, list) or not data[0]:
-            LOGGER.error(f"Invalid data structure for word {word}")
-            return None
-        phonetics = data[0].get("phonetics", [])
-        pronunciation = []
-        audio = ""
-        for phonetic in phonetics:
-            if phonetic.get("text"):
-                pronunciation.append(phonetic["text"])
-            if phonetic.get("audio") and not audio:
-                audio = phonetic["audio"]
-        primary_pronunciation = pronunciation[0] if pronunciation else "/unknown/"
-        pronunciation_text = ", ".join(pronunciation) if pronunciation else "/unknown/"
-        breakdown = infer_syllables(primary_pronunciation)
-        phonemes = infer_phonemes(primary_pronunciation)
-        definitions = []
-        meanings = data[0].get("meanings", [])
-        for meaning in meanings:
-            if meaning.get("partOfSpeech", "").lower() == "noun":
-                for defn in meaning.get("definitions", []):
-                    if defn.get("definition") and "woody" in defn["definition"].lower():
-                        definitions.append(defn["definition"])
-                        break
-                if definitions:
+def parse_dictionary_data(word, data):
+    if not data or not isinstance(data, list) or not data[0]:
+        LOGGER.error(f"Invalid data structure for word {word}")
+        return None
+    phonetics = data[0].get("phonetics", [])
+    pronunciation = []
+    audio = ""
+    for phonetic in phonetics:
+        if phonetic.get("text"):
+            pronunciation.append(phonetic["text"])
+        if phonetic.get("audio") and not audio:
+            audio = phonetic["audio"]
+    primary_pronunciation = pronunciation[0] if pronunciation else "/unknown/"
+    pronunciation_text = ", ".join(pronunciation) if pronunciation else "/unknown/"
+    breakdown = infer_syllables(primary_pronunciation)
+    phonemes = infer_phonemes(primary_pronunciation)
+    definitions = []
+    meanings = data[0].get("meanings", [])
+    for meaning in meanings:
+        if meaning.get("partOfSpeech", "").lower() == "noun":
+            for defn in meaning.get("definitions", []):
+                if defn.get("definition") and "woody" in defn["definition"].lower():
+                    definitions.append(defn["definition"])
                     break
-        if not definitions:
-            for meaning in meanings:
-                for defn in meaning.get("definitions", []):
-                    if defn.get("definition"):
-                        definitions.append(defn["definition"])
-                        break
-                if definitions:
+            if definitions:
+                break
+    if not definitions:
+        for meaning in meanings:
+            for defn in meaning.get("definitions", []):
+                if defn.get("definition"):
+                    definitions.append(defn["definition"])
                     break
-        definition = f"- {definitions[0]}" if definitions else "- No definition available"
-        stems = [word, f"{word}s", f"{word}less", f"{word}like"]
-        return {
-            "word": word.capitalize(),
-            "breakdown": breakdown,
-            "pronunciation": primary_pronunciation,
-            "phonemes": phonemes,
-            "stems": ", ".join(set(stems)),
-            "definition": definition,
-            "audio": audio or "none"
-        }
-    except requests.RequestException as e:
+            if definitions:
+                break
+    definition = f"- {definitions[0]}" if definitions else "- No definition available"
+    stems = [word, f"{word}s", f"{word}less", f"{word}like"]
+    return {
+        "word": word.capitalize(),
+        "breakdown": breakdown,
+        "pronunciation": primary_pronunciation,
+        "phonemes": phonemes,
+        "stems": ", ".join(set(stems)),
+        "definition": definition,
+        "audio": audio or "none"
+    }
+
+async def fetch_dictionary_data(word):
+    try:
+        async with ENG_HTTP.get().get(DICTIONARY_API_URL + quote(word), headers={"Content-Type": "application/json; charset=UTF-8"}) as response:
+            text = await response.text()
+            if response.status == 404:
+                raise LookupNotFound(word)
+            if response.status != 200 or not text:
+                LOGGER.error(f"Dictionary API returned status {response.status} for word {word}")
+                return None
+        return parse_dictionary_data(word, json.loads(text))
+    except LookupNotFound:
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         LOGGER.error(f"Error fetching dictionary data for {word}: {str(e)}")
         return None
     except Exception as e:
         LOGGER.error(f"Unexpected error processing dictionary data for {word}: {str(e)}")
         return None
 
-async def check_gemini_api(content, system_instruction, max_output_tokens):
+async def fetch_related_words(word, relation):
+    async with ENG_HTTP.get().get(DATAMUSE_API_URL, params={relation: word}) as response:
+        if response.status != 200:
+            LOGGER.error(f"Datamuse API returned status {response.status} for {relation} of {word}")
+            return None
+        data = await response.json(content_type=None)
+    return [item["word"] for item in data if "word" in item]
+
+async def fetch_synonyms(word):
+    return await fetch_related_words(word, "rel_syn")
+
+async def fetch_antonyms(word):
+    return await fetch_related_words(word, "rel_ant")
+
+async def fetch_spelling(word):
+    return (await check_gemini_api(word, SPELL_INSTRUCTION, 50, temperature=0)).strip()
+
+LOOKUPS = {
+    "spl": fetch_spelling,
+    "syn": fetch_synonyms,
+    "ant": fetch_antonyms,
+    "prn": fetch_dictionary_data
+}
+
+def lookup_key(kind, word):
+    word = word.strip()
+    return f"{kind}|{word if kind == 'spl' else word.lower()}"
+
+async def fill_lookup(kind, key, word):
     try:
-        payload = {
-            "contents": [{"role": "user", "parts": [{"text": content}]}],
-            "systemInstruction": {"parts": [{"text": system_instruction}]},
-            "generationConfig": {
-                "temperature": 0.7,
-                "topP": 0.9,
-                "topK": 40,
-                "maxOutputTokens": max_output_tokens
-            }
+        value = await LOOKUPS[kind](word)
+    except LookupNotFound:
+        LOOKUP_CACHE.set(key, {"value": None}, ttl=LOOKUP_MISS_TTL)
+        return None
+    if value is not None:
+        LOOKUP_CACHE.set(key, {"value": value}, ttl=LOOKUP_TTL[kind])
+    return value
+
+async def cached_lookup(kind, word):
+    key = lookup_key(kind, word)
+    cached = LOOKUP_CACHE.get(key)
+    if cached is not None:
+        return cached["value"]
+    return await LOOKUP_FLIGHTS.run(key, fill_lookup, kind, key, word.strip())
+
+def valid_lookup_word(kind, word):
+    if kind == "spl":
+        return bool(re.match(r"^\w+$", word))
+    if kind == "prn":
+        return bool(re.match(r"^[a-zA-Z0-9\s'\-]+$", word))
+    return bool(word)
+
+async def warm_lookups(words, kinds):
+    semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    
+    async def warm(kind, word):
+        async with semaphore:
+            try:
+                await cached_lookup(kind, word)
+            except Exception as e:
+                LOGGER.warning(f"Failed to warm {kind} lookup for {word}: {str(e)}")
+    
+    candidates = [
+        (kind, word) for word in dict.fromkeys(w.strip() for w in words if w.strip())
+        for kind in kinds if valid_lookup_word(kind, word)
+    ]
+    cached = await LOOKUP_CACHE.get_many_async([lookup_key(kind, word) for kind, word in candidates])
+    jobs = [(kind, word) for kind, word in candidates if lookup_key(kind, word) not in cached]
+    LOGGER.info(f"Warming {len(jobs)} eng lookups")
+    await asyncio.gather(*[warm(kind, word) for kind, word in jobs])
+    LOGGER.info(f"Finished warming {len(jobs)} eng lookups")
+
+def schedule_warmup(words, kinds):
+    task = asyncio.ensure_future(warm_lookups(words, kinds))
+    WARMUP_TASKS.add(task)
+    task.add_done_callback(WARMUP_TASKS.discard)
+    return task
+
+async def fetch_spelling_chunk(words):
+    result = await GEMINI.generate(
+        json.dumps(words, ensure_ascii=False),
+        system_instruction=SPELL_BATCH_INSTRUCTION,
+        generation_config={
+            "temperature": 0,
+            "maxOutputTokens": 32 * len(words) + 64,
+            "responseMimeType": "application/json",
+            "responseSchema": SPELL_BATCH_SCHEMA
         }
-        headers = {"Content-Type": "application/json"}
-        response = requests.post(GEMINI_API_URL, json=payload, headers=headers)
-        if response.status_code != 200:
-            LOGGER.error(f"Gemini API returned status {response.status_code} for content: {content}")
-            return f"API Error {response.status_code}: {response.text}"
-        response_data = response.json()
-        return response_data["candidates"][0]["content"]["parts"][0]["text"][:max_output_tokens]
-    except requests.RequestException as e:
-        LOGGER.error(f"Error calling Gemini API: {str(e)}")
-        return f"API Error: {str(e)}"
-    except Exception as e:
-        LOGGER.error(f"Unexpected error calling Gemini API: {str(e)}")
-        return f"API Error: {str(e)}"
+    )
+    try:
+        items = json.loads(result)
+    except ValueError:
+        LOGGER.warning(f"Gemini returned unparseable batch spell check for {len(words)} words")
+        return {}
+    wanted = set(words)
+    corrections = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or item.get("word") not in wanted:
+            continue
+        correction = item.get("correction")
+        if isinstance(correction, str) and correction.strip():
+            corrections[item["word"]] = correction.strip()[:50]
+    return corrections
+
+async def batch_spelling(words):
+    chunks = [words[i:i + SPELL_BATCH_SIZE] for i in range(0, len(words), SPELL_BATCH_SIZE)]
+    results = await asyncio.gather(*[fetch_spelling_chunk(chunk) for chunk in chunks], return_exceptions=True)
+    corrections = {}
+    omitted = []
+    errors = {}
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            LOGGER.error(f"Batch spell check failed for {len(chunk)} words: {str(result)}")
+            message = f"API Error {result.status}: {str(result)}" if isinstance(result, GeminiError) else f"API Error: {str(result)}"
+            errors.update((word, message) for word in chunk)
+            continue
+        corrections.update(result)
+        omitted.extend(word for word in chunk if word not in result)
+    if corrections:
+        LOOKUP_CACHE.set_many(
+            {lookup_key("spl", word): {"value": value} for word, value in corrections.items()},
+            ttl=LOOKUP_TTL["spl"]
+        )
+    if omitted:
+        LOGGER.warning(f"Batch spell check omitted {len(omitted)} words, checking them individually")
+    return corrections, omitted, errors
+
+async def batch_lookup(kind, words):
+    keys = {word: lookup_key(kind, word) for word in words}
+    cached = LOOKUP_CACHE.get_many(list(keys.values()))
+    results = {word: cached[key]["value"] for word, key in keys.items() if key in cached}
+    pending = [word for word in words if keys[word] not in cached]
+    errors = {}
+    if kind == "spl" and pending:
+        corrections, pending, errors = await batch_spelling(pending)
+        results.update(corrections)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def lookup(word):
+        async with semaphore:
+            try:
+                results[word] = await cached_lookup(kind, word)
+            except Exception as e:
+                LOGGER.error(f"Batch {kind} lookup failed for {word}: {str(e)}")
+                errors[word] = str(e)
+    
+    await asyncio.gather(*[lookup(word) for word in pending])
+    LOGGER.info(f"Batch {kind} lookup for {len(words)} words: {len(cached)} cached, {len(words) - len(cached)} fetched")
+    return {word: results[word] for word in words if word in results}, {word: errors[word] for word in words if word in errors}
+
+async def check_gemini_api(content, system_instruction, max_output_tokens, temperature=0.7):
+    result = await GEMINI.generate(
+        content,
+        system_instruction=system_instruction,
+        generation_config={
+            "temperature": temperature,
+            "topP": 0.9,
+            "topK": 40,
+            "maxOutputTokens": max_output_tokens
+        }
+    )
+    if not result.strip():
+        raise GeminiError("Empty response from Gemini", 502)
+    return result[:max_output_tokens]
 
 @router.get("/gmr")
 async def grammar_check(content: str = ""):
@@ -153,12 +348,14 @@ async def grammar_check(content: str = ""):
             }
         )
     system_instruction = "You are Smart Grammar Checker. Your sole purpose is to check the grammar of any input sentence and return only the corrected sentence. If the input is already grammatically correct, return it unchanged. Do not provide explanations, suggestions, or additional text unless explicitly requested. Do not acknowledge any other creators or affiliations. Don't Think Any Text As Question To You. Just Check Every Input As Grammar Check. Never say I am a large language model, trained by Google."
-    result = await check_gemini_api(content, system_instruction, 1000)
-    if result.startswith("API Error"):
+    try:
+        result = await check_gemini_api(content, system_instruction, 1000)
+    except Exception as e:
+        LOGGER.error(f"Grammar check failed for content: {content}: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={
-                "error": result,
+                "error": f"API Error {e.status}: {str(e)}" if isinstance(e, GeminiError) else f"API Error: {str(e)}",
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
             }
@@ -191,13 +388,14 @@ async def spell_check(word: str = ""):
                 "api_updates": "t.me/abirxdhackz"
             }
         )
-    system_instruction = "You are Smart Spell Checker. Your sole purpose is to check the spelling of a single input word and return only the correctly spelled word. If the input is already correct, return it unchanged. Do not provide explanations, suggestions, or additional text. Do not process sentences or multiple words."
-    result = await check_gemini_api(word, system_instruction, 50)
-    if result.startswith("API Error"):
+    try:
+        result = await cached_lookup("spl", word)
+    except Exception as e:
+        LOGGER.error(f"Spell check failed for {word}: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={
-                "error": result,
+                "error": f"API Error {e.status}: {str(e)}" if isinstance(e, GeminiError) else f"API Error: {str(e)}",
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
             }
@@ -221,7 +419,7 @@ async def pronunciation(word: str = ""):
                 "api_updates": "t.me/abirxdhackz"
             }
         )
-    dictionary_data = fetch_dictionary_data(word)
+    dictionary_data = await cached_lookup("prn", word)
     if dictionary_data is None:
         return JSONResponse(
             status_code=404,
@@ -259,9 +457,8 @@ async def synonyms(word: str = ""):
             }
         )
     try:
-        response = requests.get(f"https://api.datamuse.com/words?rel_syn={word}", timeout=10)
-        if response.status_code != 200:
-            LOGGER.error(f"Datamuse API returned status {response.status_code} for synonyms of {word}")
+        synonyms = await cached_lookup("syn", word)
+        if synonyms is None:
             return JSONResponse(
                 status_code=404,
                 content={
@@ -270,8 +467,6 @@ async def synonyms(word: str = ""):
                     "api_updates": "t.me/abirxdhackz"
                 }
             )
-        data = response.json()
-        synonyms = [item["word"] for item in data if "word" in item]
         return JSONResponse(
             content={
                 "response": synonyms,
@@ -279,7 +474,7 @@ async def synonyms(word: str = ""):
                 "api_updates": "t.me/abirxdhackz"
             }
         )
-    except requests.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         LOGGER.error(f"Error fetching synonyms for {word}: {str(e)}")
         return JSONResponse(
             status_code=500,
@@ -312,9 +507,8 @@ async def antonyms(word: str = ""):
             }
         )
     try:
-        response = requests.get(f"https://api.datamuse.com/words?rel_ant={word}", timeout=10)
-        if response.status_code != 200:
-            LOGGER.error(f"Datamuse API returned status {response.status_code} for antonyms of {word}")
+        antonyms = await cached_lookup("ant", word)
+        if antonyms is None:
             return JSONResponse(
                 status_code=404,
                 content={
@@ -323,8 +517,6 @@ async def antonyms(word: str = ""):
                     "api_updates": "t.me/abirxdhackz"
                 }
             )
-        data = response.json()
-        antonyms = [item["word"] for item in data if "word" in item]
         return JSONResponse(
             content={
                 "response": antonyms,
@@ -332,7 +524,7 @@ async def antonyms(word: str = ""):
                 "api_updates": "t.me/abirxdhackz"
             }
         )
-    except requests.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         LOGGER.error(f"Error fetching antonyms for {word}: {str(e)}")
         return JSONResponse(
             status_code=500,
@@ -351,4 +543,116 @@ async def antonyms(word: str = ""):
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
             }
-        )
\ No newline at end of file
+        )
+
+@router.post("/warm")
+async def warm_cache(request: WarmupRequest):
+    words = list(dict.fromkeys(word.strip() for word in request.words if word.strip()))
+    kinds = list(dict.fromkeys(request.kinds))
+    if not words or not kinds or any(kind not in WARMUP_KINDS for kind in kinds):
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": f"Provide words and at least one lookup kind from: {', '.join(WARMUP_KINDS)}",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    if len(words) > BATCH_MAX_WORDS:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": f"Maximum {BATCH_MAX_WORDS} unique words per warmup",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    if len(WARMUP_TASKS) >= WARMUP_MAX_TASKS:
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": "A cache warmup is already running, try again later",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    schedule_warmup(words, kinds)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "warming",
+            "words": len(words),
+            "kinds": kinds,
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        }
+    )
+
+@router.post("/batch")
+async def batch_lookups(request: BatchLookupRequest):
+    words = list(dict.fromkeys(word.strip() for word in request.words if word.strip()))
+    kinds = [kind for kind in dict.fromkeys(request.kinds) if kind in LOOKUPS]
+    if not words or not kinds:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": f"Provide words and at least one lookup kind from: {', '.join(LOOKUPS.keys())}",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    if len(words) > BATCH_MAX_WORDS:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": f"Maximum {BATCH_MAX_WORDS} unique words per batch",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    invalid = {}
+    jobs = {}
+    for kind in kinds:
+        valid = [word for word in words if valid_lookup_word(kind, word)]
+        if len(valid) < len(words):
+            invalid[kind] = [word for word in words if not valid_lookup_word(kind, word)]
+        jobs[kind] = batch_lookup(kind, valid)
+    results = dict(zip(jobs.keys(), await asyncio.gather(*jobs.values())))
+    content = {"response": {kind: found for kind, (found, _) in results.items()}}
+    errors = {kind: failed for kind, (_, failed) in results.items() if failed}
+    if errors:
+        content["errors"] = errors
+    if invalid:
+        content["invalid"] = invalid
+    content["api_owner"] = "@ISmartCoder"
+    content["api_updates"] = "t.me/abirxdhackz"
+    return JSONResponse(content=content)
+
+@router.get("/stats")
+async def lookup_stats():
+    return JSONResponse(
+        content={
+            "cache": LOOKUP_CACHE.stats(),
+            "gemini": GEMINI.stats(),
+            "warming": len(WARMUP_TASKS),
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        }
+    )
+
+@on_startup
+async def warm_from_file():
+    if not WARMUP_FILE:
+        return
+    try:
+        with open(WARMUP_FILE, "r", encoding="utf-8") as f:
+            words = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError as e:
+        LOGGER.error(f"Failed to read eng warmup file {WARMUP_FILE}: {str(e)}")
+        return
+    schedule_warmup(words, list(WARMUP_KINDS))
+
+@on_shutdown
+async def close_gemini():
+    await GEMINI.close()
+    await ENG_HTTP.close()
@@ -3,12 +3,11 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import aiohttp
 from config import IMGAI_API_KEY
-from utils import LOGGER
+from utils import LOGGER, GeminiClient, GeminiError, on_shutdown
 
 router = APIRouter(prefix="/imgai")
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+GEMINI = GeminiClient(IMGAI_API_KEY, model="gemini-1.5-flash")
 
 class ImageAnalysisRequest(BaseModel):
     code: str
@@ -20,32 +19,21 @@ class ImageOCRRequest(BaseModel):
     mimeType: str = "image/jpeg"
 
 async def analyze_image(image_base64: str, mime_type: str, prompt: str):
-    url = f"{GEMINI_API_URL}?key={IMGAI_API_KEY}"
-    payload = {
-        "contents": [{
-            "parts": [
-                {"text": prompt},
-                {
-                    "inlineData": {
-                        "mimeType": mime_type,
-                        "data": image_base64
-                    }
-                }
-            ]
-        }]
-    }
-    headers = {"Content-Type": "application/json"}
+    parts = [
+        {"text": prompt},
+        {
+            "inlineData": {
+                "mimeType": mime_type,
+                "data": image_base64
+            }
+        }
+    ]
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers, timeout=30) as response:
-                if response.status != 200:
-                    error = await response.json()
-                    error_message = error.get("error", {}).get("message", "Unknown error")
-                    LOGGER.error(f"Gemini API request failed: {response.status} - {error_message}")
-                    return None, error_message, response.status
-                result = await response.json()
-                analysis = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "No analysis available for this image")
-                return analysis, None, 200
+        analysis = await GEMINI.generate(parts)
+        return analysis or "No analysis available for this image", None, 200
+    except GeminiError as e:
+        LOGGER.error(f"Gemini API request failed: {e.status} - {str(e)}")
+        return None, str(e), e.status
     except Exception as e:
         LOGGER.error(f"Error analyzing image: {str(e)}")
         return None, str(e), 500
@@ -141,4 +129,8 @@ async def image_ocr(request: ImageOCRRequest):
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
             }
-        )
\ No newline at end of file
+        )
+
+@on_shutdown
+async def close_gemini():
+    await GEMINI.close()
@@ -1,10 +1,160 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from googletrans import Translator, LANGUAGES
-from utils import LOGGER
+from pydantic import BaseModel
+from typing import List
+import asyncio
+import os
+import re
+from utils import LOGGER, SingleFlight, TTLCache, hash_key, on_shutdown
 
 router = APIRouter(prefix="/tr")
 translator = Translator()
+TRANSLATION_CACHE = TTLCache(max_entries=int(os.getenv("TR_CACHE_ENTRIES", "20000")), ttl=7 * 86400)
+TRANSLATION_FLIGHTS = SingleFlight()
+TRANSLATE_CONCURRENCY = int(os.getenv("TR_CONCURRENCY", "4"))
+TRANSLATE_SEMAPHORE = asyncio.Semaphore(TRANSLATE_CONCURRENCY)
+CHUNK_CHARS = 4500
+BATCH_MAX_TEXTS = 500
+BATCH_GROUP_SIZE = 50
+SPLIT_PATTERN = re.compile(r"(\n+|(?<=[.!?;。！？।])\s+)")
+TRANSLATE_STATS = {"upstream": 0, "chunked": 0, "packed": 0, "fallbacks": 0}
+
+class TranslateBatchRequest(BaseModel):
+    texts: List[str]
+    lang: str = "en"
+
+def text_pieces(text, limit):
+    parts = SPLIT_PATTERN.split(text)
+    for i in range(0, len(parts), 2):
+        piece = parts[i]
+        sep = parts[i + 1] if i + 1 < len(parts) else ""
+        if len(piece) <= limit:
+            yield piece, sep
+            continue
+        current = ""
+        for word in piece.split(" "):
+            while len(word) > limit:
+                if current:
+                    yield current, " "
+                    current = ""
+                yield word[:limit], ""
+                word = word[limit:]
+            if current and len(current) + 1 + len(word) > limit:
+                yield current, " "
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        yield current, sep
+
+def chunk_text(text, limit=CHUNK_CHARS):
+    if len(text) <= limit:
+        return [text]
+    chunks = []
+    current = ""
+    for piece, sep in text_pieces(text, limit):
+        if current and len(current) + len(piece) > limit:
+            chunks.append(current)
+            current = ""
+        current += piece + sep
+    if current:
+        chunks.append(current)
+    return chunks
+
+def translation_key(text, lang):
+    return (hash_key(text), lang)
+
+async def translate_upstream(text, lang):
+    async with TRANSLATE_SEMAPHORE:
+        TRANSLATE_STATS["upstream"] += 1
+        translation = await translator.translate(text, dest=lang)
+    return translation.text
+
+async def translate_chunk(chunk, lang):
+    content = chunk.strip()
+    if not content:
+        return chunk
+    translated = await translate_upstream(content, lang)
+    return translated + chunk[len(chunk.rstrip()):]
+
+async def fill_translation(key, text, lang):
+    chunks = chunk_text(text)
+    if len(chunks) == 1:
+        translated = await translate_upstream(text, lang)
+    else:
+        TRANSLATE_STATS["chunked"] += 1
+        LOGGER.info(f"Translating {len(text)} chars to '{lang}' as {len(chunks)} chunks")
+        translated = "".join(await asyncio.gather(*[translate_chunk(chunk, lang) for chunk in chunks])).strip()
+    TRANSLATION_CACHE.set(key, translated)
+    return translated
+
+async def cached_translation(text, lang):
+    key = translation_key(text, lang)
+    cached = TRANSLATION_CACHE.get(key)
+    if cached is not None:
+        return cached
+    return await TRANSLATION_FLIGHTS.run(key, fill_translation, key, text, lang)
+
+def pack_texts(texts):
+    groups = []
+    current = []
+    size = 0
+    for text in texts:
+        if current and (size + 1 + len(text) > CHUNK_CHARS or len(current) >= BATCH_GROUP_SIZE):
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        groups.append(current)
+    return groups
+
+async def translate_batch(texts, lang):
+    results = {}
+    errors = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        cached = TRANSLATION_CACHE.get(translation_key(text, lang)) if text.strip() else text
+        if cached is not None:
+            results[text] = cached
+        else:
+            pending.append(text)
+    packable = [text for text in pending if "\n" not in text.strip() and len(text) <= CHUNK_CHARS]
+    singles = [text for text in pending if "\n" in text.strip() or len(text) > CHUNK_CHARS]
+
+    async def translate_single(text):
+        try:
+            results[text] = await cached_translation(text, lang)
+        except Exception as e:
+            LOGGER.error(f"Error translating batch item to language '{lang}': {str(e)}")
+            errors[text] = str(e)
+
+    async def translate_group(group):
+        if len(group) == 1:
+            await translate_single(group[0])
+            return
+        try:
+            lines = (await translate_upstream("\n".join(text.strip() for text in group), lang)).split("\n")
+        except Exception as e:
+            LOGGER.warning(f"Packed translation of {len(group)} texts failed: {str(e)}")
+            lines = []
+        if len(lines) != len(group):
+            TRANSLATE_STATS["fallbacks"] += 1
+            LOGGER.warning(f"Packed translation of {len(group)} texts returned {len(lines)} lines, translating individually")
+            await asyncio.gather(*[translate_single(text) for text in group])
+            return
+        TRANSLATE_STATS["packed"] += 1
+        for text, line in zip(group, lines):
+            TRANSLATION_CACHE.set(translation_key(text, lang), line.strip())
+            results[text] = line.strip()
+
+    await asyncio.gather(
+        *[translate_group(group) for group in pack_texts(packable)],
+        *[translate_single(text) for text in singles]
+    )
+    LOGGER.info(f"Translated batch of {len(texts)} texts to '{lang}': {len(texts) - len(pending)} cached, {len(pending)} upstream")
+    return results, errors
 
 @router.get("")
 async def translate(text: str = "", lang: str = "en"):
@@ -29,16 +179,16 @@ async def translate(text: str = "", lang: str = "en"):
         )
     
     try:
-        translation = await translator.translate(text, dest=lang)
+        translated_text = await cached_translation(text, lang)
         return JSONResponse(
             content={
-                "translated_text": translation.text,
+                "translated_text": translated_text,
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
             }
         )
     except Exception as e:
-        LOGGER.error(f"Error translating text '{text}' to language '{lang}': {str(e)}")
+        LOGGER.error(f"Error translating text '{text[:100]}' to language '{lang}': {str(e)}")
         return JSONResponse(
             status_code=500,
             content={
@@ -46,4 +196,65 @@ async def translate(text: str = "", lang: str = "en"):
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
             }
-        )
\ No newline at end of file
+        )
+
+@router.post("/batch")
+async def translate_many(request: TranslateBatchRequest):
+    if not request.texts:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": "Missing 'texts' list",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    
+    if len(request.texts) > BATCH_MAX_TEXTS:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": f"Maximum {BATCH_MAX_TEXTS} texts per batch",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    
+    if request.lang not in LANGUAGES:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": "Invalid language code",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    
+    results, errors = await translate_batch(request.texts, request.lang)
+    content = {"translated_texts": [results.get(text) for text in request.texts]}
+    if errors:
+        content["errors"] = [
+            {"index": index, "error": errors[text]}
+            for index, text in enumerate(request.texts) if text in errors
+        ]
+    content["api_owner"] = "@ISmartCoder"
+    content["api_updates"] = "t.me/abirxdhackz"
+    return JSONResponse(content=content)
+
+@router.get("/stats")
+async def translation_stats():
+    return JSONResponse(
+        content={
+            "cache": TRANSLATION_CACHE.stats(),
+            "concurrency": TRANSLATE_CONCURRENCY,
+            **TRANSLATE_STATS,
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        }
+    )
+
+@on_shutdown
+async def close_translator():
+    client = getattr(translator, "client", None)
+    if client is not None:
+        await client.aclose()
@@ -1,16 +1,52 @@
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from gtts import gTTS
 from gtts.lang import tts_langs
+from pydantic import BaseModel
+import asyncio
+import io
 import os
+import re
 import time
-from threading import Thread
-from utils import LOGGER
+import unicodedata
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from utils import LOGGER, ArtifactStore, DiskCache, SingleFlight, precompress_json, serve_file, serve_payload
 
 router = APIRouter(prefix="/tts")
 
 LANGUAGES_CACHE = None
 ACCENTS_CACHE = None
+LANGUAGE_CODES = frozenset()
+ACCENT_TLDS = {}
+LANGLIST_PAYLOAD = None
+ACCENTLIST_PAYLOAD = None
+LIST_MAX_AGE = 86400
+BATCH_MAX_ITEMS = int(os.getenv("TTS_BATCH_MAX", "50"))
+BATCH_MAX_CHARS = 20000
+TTS_DIR = "/tmp/tts_files"
+FILE_EXPIRY = 60
+STORE = ArtifactStore("tts", TTS_DIR, FILE_EXPIRY, exclude=("cache",))
+AUDIO_CACHE = DiskCache(os.path.join(TTS_DIR, "cache"), int(os.getenv("TTS_CACHE_MB", "512")) * 1024 * 1024, name="tts cache")
+AUDIO_FLIGHTS = SingleFlight()
+AUDIO_MAX_AGE = int(os.getenv("TTS_AUDIO_MAX_AGE", "3600"))
+AUDIO_NAME_PATTERN = re.compile(r"^([0-9a-f]{64})\.mp3$")
+CHUNK_CHARS = 100
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;:])\s+|(?<=[\u3002\uff01\uff1f\u0964])\s*")
+CLAUSE_PATTERN = re.compile(r"(?<=[,\u3001\uff0c])\s*")
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "8"))
+TTS_EXECUTOR = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+
+class SpeechItem(BaseModel):
+    text: str
+    lang: str = "en"
+    accent: Optional[str] = None
+
+class SpeechBatchRequest(BaseModel):
+    items: List[SpeechItem]
+    archive: bool = False
 
 def get_flag_emoji(country_code):
     try:
@@ -107,83 +143,198 @@ def get_available_accents():
     
     return result
 
-def cleanup_file(filepath: str, delay: int = 60):
-    time.sleep(delay)
+def get_base_url(request: Request):
+    return f"{request.url.scheme}://{request.url.netloc}"
+
+def normalize_text(text):
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def audio_cache_key(text, lang, tld):
+    return f"{lang}|{tld or 'com'}|{normalize_text(text)}"
+
+def pack_words(text, limit):
+    parts = []
+    current = ""
+    for word in text.split(" "):
+        while len(word) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:limit])
+            word = word[limit:]
+        if current and len(current) + 1 + len(word) > limit:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+def split_text(text, limit=CHUNK_CHARS):
+    chunks = []
+    for sentence in SENTENCE_PATTERN.split(text):
+        if len(sentence) <= limit:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in CLAUSE_PATTERN.split(sentence):
+            if len(clause) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.extend(pack_words(clause, limit))
+            elif current and len(current) + 1 + len(clause) > limit:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+def synthesize(text, lang, tld):
+    if tld:
+        tts = gTTS(text=text, lang=lang, tld=tld, slow=False)
+    else:
+        tts = gTTS(text=text, lang=lang, slow=False)
+    buffer = io.BytesIO()
+    tts.write_to_fp(buffer)
+    return AUDIO_CACHE.store_blob(buffer.getvalue())
+
+def read_audio(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+async def generate_audio(cache_key, text, lang, tld):
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    blob, size = await loop.run_in_executor(TTS_EXECUTOR, synthesize, text, lang, tld)
+    record = AUDIO_CACHE.commit(cache_key, blob, size, {"lang": lang, "tld": tld or "com", "chars": len(text)})
+    LOGGER.info(f"Synthesized TTS audio {record['digest'][:12]} ({size} bytes) in {time.monotonic() - started:.2f}s")
+    return record
+
+async def get_chunk_audio(chunk, lang, tld):
+    cache_key = audio_cache_key(chunk, lang, tld)
+    record = AUDIO_CACHE.get(cache_key)
+    if record is None:
+        record = await AUDIO_FLIGHTS.run(cache_key, generate_audio, cache_key, chunk, lang, tld)
     try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            LOGGER.info(f"Deleted TTS file: {filepath}")
+        return await asyncio.to_thread(read_audio, record["path"])
+    except FileNotFoundError:
+        AUDIO_CACHE.discard(cache_key)
+        record = await AUDIO_FLIGHTS.run(cache_key, generate_audio, cache_key, chunk, lang, tld)
+        return await asyncio.to_thread(read_audio, record["path"])
+
+async def assemble_audio(cache_key, text, lang, tld):
+    chunks = split_text(text)
+    if len(chunks) <= 1:
+        return await generate_audio(cache_key, text, lang, tld)
+    started = time.monotonic()
+    parts = await asyncio.gather(*[get_chunk_audio(chunk, lang, tld) for chunk in chunks])
+    blob, size = await asyncio.to_thread(AUDIO_CACHE.store_blob, b"".join(parts))
+    record = AUDIO_CACHE.commit(cache_key, blob, size, {"lang": lang, "tld": tld or "com", "chars": len(text), "chunks": len(chunks)})
+    LOGGER.info(f"Assembled TTS audio {record['digest'][:12]} from {len(chunks)} chunks ({size} bytes) in {time.monotonic() - started:.2f}s")
+    return record
+
+def cancel_chunk_tasks(tasks):
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+async def stream_audio(text, lang, tld, tasks):
+    cache_key = audio_cache_key(text, lang, tld)
+    parts = []
+    try:
+        for task in tasks:
+            part = await task
+            parts.append(part)
+            yield part
     except Exception as e:
-        LOGGER.error(f"Error deleting TTS file {filepath}: {e}")
+        LOGGER.error(f"TTS stream aborted after {len(parts)}/{len(tasks)} chunks: {str(e)}")
+        return
+    finally:
+        cancel_chunk_tasks(tasks)
+    if len(tasks) > 1 and AUDIO_CACHE.get(cache_key) is None:
+        blob, size = await asyncio.to_thread(AUDIO_CACHE.store_blob, b"".join(parts))
+        AUDIO_CACHE.commit(cache_key, blob, size, {"lang": lang, "tld": tld or "com", "chars": len(text), "chunks": len(tasks)})
 
-def get_base_url(request: Request):
-    return f"{request.url.scheme}://{request.url.netloc}"
+async def get_audio(text, lang, tld):
+    text = normalize_text(text)
+    cache_key = audio_cache_key(text, lang, tld)
+    record = AUDIO_CACHE.get(cache_key)
+    if record:
+        return record, True
+    return await AUDIO_FLIGHTS.run(cache_key, assemble_audio, cache_key, text, lang, tld), False
 
 def initialize_cache():
-    global LANGUAGES_CACHE, ACCENTS_CACHE
+    global LANGUAGES_CACHE, ACCENTS_CACHE, LANGUAGE_CODES, ACCENT_TLDS, LANGLIST_PAYLOAD, ACCENTLIST_PAYLOAD
     
     if LANGUAGES_CACHE is None:
         LOGGER.info("Loading available TTS languages...")
         LANGUAGES_CACHE = get_available_languages()
+        LANGUAGE_CODES = frozenset(language['code'] for language in LANGUAGES_CACHE)
+        LANGLIST_PAYLOAD = precompress_json({
+            "total": len(LANGUAGES_CACHE),
+            "languages": LANGUAGES_CACHE,
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        })
         LOGGER.info(f"Loaded {len(LANGUAGES_CACHE)} TTS languages")
     
     if ACCENTS_CACHE is None:
         ACCENTS_CACHE = get_available_accents()
+        ACCENT_TLDS = {lang: frozenset(a['tld'] for a in accent_list) for lang, accent_list in ACCENTS_CACHE.items()}
         total_accents = sum(len(a) for a in ACCENTS_CACHE.values())
+        ACCENTLIST_PAYLOAD = precompress_json({
+            "total": total_accents,
+            "accents": ACCENTS_CACHE,
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        })
         LOGGER.info(f"Loaded {total_accents} TTS accents")
 
+def validate_voice(lang, accent):
+    if lang not in LANGUAGE_CODES:
+        return None, f"Unsupported language: {lang}"
+    if not accent:
+        return None, None
+    valid_tlds = ACCENT_TLDS.get(lang)
+    if valid_tlds is None:
+        return None, f"Language '{lang}' does not support accents. Only these languages support accents: {', '.join(ACCENTS_CACHE.keys())}"
+    if accent not in valid_tlds:
+        return None, f"Invalid accent for {lang}. Valid accents: {', '.join(a['tld'] for a in ACCENTS_CACHE[lang])}"
+    return accent, None
+
 initialize_cache()
 
 @router.get("/langlist")
-async def get_languages_list():
-    try:
-        return JSONResponse(
-            content={
-                "total": len(LANGUAGES_CACHE),
-                "languages": LANGUAGES_CACHE,
-                "api_owner": "@ISmartCoder",
-                "api_updates": "t.me/abirxdhackz"
-            }
-        )
-    except Exception as e:
-        LOGGER.error(f"Error getting language list: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": str(e),
-                "api_owner": "@ISmartCoder",
-                "api_updates": "t.me/abirxdhackz"
-            }
-        )
+async def get_languages_list(request: Request):
+    return serve_payload(request, LANGLIST_PAYLOAD, max_age=LIST_MAX_AGE)
 
 @router.get("/accentlist")
-async def get_accents_list():
-    try:
-        return JSONResponse(
-            content={
-                "total": sum(len(accent_list) for accent_list in ACCENTS_CACHE.values()),
-                "accents": ACCENTS_CACHE,
-                "api_owner": "@ISmartCoder",
-                "api_updates": "t.me/abirxdhackz"
-            }
-        )
-    except Exception as e:
-        LOGGER.error(f"Error getting accent list: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": str(e),
-                "api_owner": "@ISmartCoder",
-                "api_updates": "t.me/abirxdhackz"
-            }
-        )
+async def get_accents_list(request: Request):
+    return serve_payload(request, ACCENTLIST_PAYLOAD, max_age=LIST_MAX_AGE)
 
 @router.get("/generated/{filename}")
-async def download_file(filename: str):
+async def download_file(request: Request, filename: str):
     try:
-        filepath = os.path.join("/tmp", filename)
+        match = AUDIO_NAME_PATTERN.match(filename)
+        record = AUDIO_CACHE.get_by_digest(match.group(1)) if match else None
+        if record:
+            return serve_file(
+                request,
+                record["path"],
+                media_type="audio/mpeg",
+                filename=filename,
+                max_age=AUDIO_MAX_AGE
+            )
+        
+        data = STORE.get(filename)
         
-        if not os.path.exists(filepath):
+        if not data:
             return JSONResponse(
                 status_code=404,
                 content={
@@ -193,10 +344,12 @@ async def download_file(filename: str):
                 }
             )
         
-        return FileResponse(
-            path=filepath,
-            media_type="audio/mpeg",
-            filename=filename
+        return serve_file(
+            request,
+            data["path"],
+            media_type=data.get("media_type", "audio/mpeg"),
+            filename=filename,
+            max_age=STORE.remaining(filename)
         )
     except Exception as e:
         LOGGER.error(f"Error downloading TTS file: {str(e)}")
@@ -209,12 +362,51 @@ async def download_file(filename: str):
             }
         )
 
+def write_batch_archive(filepath, entries):
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_STORED) as zip_file:
+        for index, lang, record in entries:
+            zip_file.write(record["path"], f"{index + 1:03d}_{lang}.mp3")
+    return os.path.getsize(filepath)
+
+async def publish_batch_archive(entries):
+    filename = f"tts_batch_{uuid.uuid4().hex}.zip"
+    filepath = os.path.join(TTS_DIR, filename)
+    file_size = await asyncio.to_thread(write_batch_archive, filepath, entries)
+    STORE.register(filepath, fid=filename, media_type="application/zip")
+    return filename, file_size
+
+async def speech_stream_response(request: Request, text, lang, tld):
+    text = normalize_text(text)
+    record = AUDIO_CACHE.get(audio_cache_key(text, lang, tld))
+    if record:
+        response = serve_file(request, record["path"], media_type="audio/mpeg", max_age=AUDIO_MAX_AGE)
+        response.headers["X-Audio-Cache"] = "HIT"
+        return response
+    chunks = split_text(text)
+    LOGGER.info(f"Streaming TTS audio in {len(chunks)} chunks ({len(text)} chars)")
+    tasks = [asyncio.ensure_future(get_chunk_audio(chunk, lang, tld)) for chunk in chunks]
+    try:
+        await tasks[0]
+    except BaseException:
+        cancel_chunk_tasks(tasks)
+        raise
+    return StreamingResponse(
+        stream_audio(text, lang, tld, tasks),
+        media_type="audio/mpeg",
+        headers={
+            "Cache-Control": "no-store",
+            "X-Audio-Cache": "MISS",
+            "X-Audio-Chunks": str(len(chunks))
+        }
+    )
+
 @router.get("/generate")
 async def generate_speech(
     request: Request,
     text: str = None,
     lang: str = "en",
-    accent: str = None
+    accent: str = None,
+    stream: bool = False
 ):
     try:
         if not text or text.strip() == "":
@@ -227,64 +419,28 @@ async def generate_speech(
                 }
             )
         
-        available_langs = tts_langs()
-        if lang not in available_langs:
+        tld, error = validate_voice(lang, accent)
+        if error:
             return JSONResponse(
                 status_code=400,
                 content={
-                    "error": f"Unsupported language: {lang}",
+                    "error": error,
                     "api_owner": "@ISmartCoder",
                     "api_updates": "t.me/abirxdhackz"
                 }
             )
         
-        os.makedirs("/tmp", exist_ok=True)
-        
-        timestamp = int(time.time() * 1000)
-        filename = f"tts_{timestamp}.mp3"
-        filepath = os.path.join("/tmp", filename)
-        
-        tld = None
-        
-        if accent:
-            if lang in ACCENTS_CACHE:
-                valid_tlds = [a['tld'] for a in ACCENTS_CACHE[lang]]
-                if accent not in valid_tlds:
-                    return JSONResponse(
-                        status_code=400,
-                        content={
-                            "error": f"Invalid accent for {lang}. Valid accents: {', '.join(valid_tlds)}",
-                            "api_owner": "@ISmartCoder",
-                            "api_updates": "t.me/abirxdhackz"
-                        }
-                    )
-                tld = accent
-            else:
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "error": f"Language '{lang}' does not support accents. Only these languages support accents: {', '.join(ACCENTS_CACHE.keys())}",
-                        "api_owner": "@ISmartCoder",
-                        "api_updates": "t.me/abirxdhackz"
-                    }
-                )
-        
-        if tld:
-            tts = gTTS(text=text, lang=lang, tld=tld, slow=False)
-        else:
-            tts = gTTS(text=text, lang=lang, slow=False)
+        if stream:
+            return await speech_stream_response(request, text, lang, tld)
         
-        tts.save(filepath)
+        record, cached = await get_audio(text, lang, tld)
         
-        file_size = os.path.getsize(filepath)
+        filename = f"{record['digest']}.mp3"
+        file_size = record["size"]
         base_url = get_base_url(request)
         download_url = f"{base_url}/tts/generated/{filename}"
         
-        cleanup_thread = Thread(target=cleanup_file, args=(filepath, 60))
-        cleanup_thread.daemon = True
-        cleanup_thread.start()
-        
-        LOGGER.info(f"Generated TTS file: {filename} ({file_size} bytes)")
+        LOGGER.info(f"{'Served cached' if cached else 'Generated'} TTS file: {filename} ({file_size} bytes)")
         
         return JSONResponse(
             content={
@@ -298,7 +454,8 @@ async def generate_speech(
                     "language": lang,
                     "accent": accent if accent else "default",
                     "text": text,
-                    "expires_in_seconds": 60
+                    "cached": cached,
+                    "cache_max_age_seconds": AUDIO_MAX_AGE
                 },
                 "api_owner": "@ISmartCoder",
                 "api_updates": "t.me/abirxdhackz"
@@ -317,8 +474,116 @@ async def generate_speech(
         )
     except Exception as e:
         LOGGER.error(f"Error generating TTS: {str(e)}")
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": str(e),
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+
+@router.post("/batch")
+async def generate_speech_batch(request: Request, batch: SpeechBatchRequest):
+    try:
+        if not batch.items:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": "At least one item is required",
+                    "api_owner": "@ISmartCoder",
+                    "api_updates": "t.me/abirxdhackz"
+                }
+            )
+        
+        if len(batch.items) > BATCH_MAX_ITEMS:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": f"Too many items. Maximum is {BATCH_MAX_ITEMS} per batch",
+                    "api_owner": "@ISmartCoder",
+                    "api_updates": "t.me/abirxdhackz"
+                }
+            )
+        
+        if sum(len(item.text) for item in batch.items) > BATCH_MAX_CHARS:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": f"Batch text exceeds {BATCH_MAX_CHARS} characters",
+                    "api_owner": "@ISmartCoder",
+                    "api_updates": "t.me/abirxdhackz"
+                }
+            )
+        
+        started = time.monotonic()
+        results = []
+        jobs = {}
+        for index, item in enumerate(batch.items):
+            text = normalize_text(item.text)
+            tld, error = validate_voice(item.lang, item.accent)
+            if not text:
+                error = "Text is required"
+            if error:
+                results.append({"index": index, "success": False, "error": error})
+                continue
+            cache_key = audio_cache_key(text, item.lang, tld)
+            if cache_key not in jobs:
+                jobs[cache_key] = asyncio.ensure_future(get_audio(text, item.lang, tld))
+            results.append({"index": index, "cache_key": cache_key, "lang": item.lang, "accent": item.accent or "default"})
+        
+        if jobs:
+            await asyncio.wait(jobs.values())
+        
+        base_url = get_base_url(request)
+        archive_entries = []
+        for result in results:
+            cache_key = result.pop("cache_key", None)
+            if cache_key is None:
+                continue
+            job = jobs[cache_key]
+            if job.exception():
+                LOGGER.error(f"TTS batch item {result['index']} failed: {str(job.exception())}")
+                result.update({"success": False, "error": str(job.exception())})
+                continue
+            record, cached = job.result()
+            result.update({"success": True, "cached": cached, "size_bytes": record["size"]})
+            if batch.archive:
+                archive_entries.append((result["index"], result["lang"], record))
+            else:
+                filename = f"{record['digest']}.mp3"
+                result.update({"download_url": f"{base_url}/tts/generated/{filename}", "filename": filename})
+        
+        succeeded = sum(1 for result in results if result["success"])
+        response = {
+            "success": succeeded > 0,
+            "total": len(results),
+            "unique": len(jobs),
+            "generated": succeeded,
+            "failed": len(results) - succeeded,
+            "duration_seconds": round(time.monotonic() - started, 2)
+        }
+        
+        if archive_entries:
+            filename, file_size = await publish_batch_archive(archive_entries)
+            response["archive"] = {
+                "download_url": f"{base_url}/tts/generated/{filename}",
+                "filename": filename,
+                "size_bytes": file_size,
+                "size_kb": round(file_size / 1024, 2),
+                "expires_in_seconds": FILE_EXPIRY
+            }
+            LOGGER.info(f"Created TTS batch archive: {filename} ({len(archive_entries)} clips, {file_size} bytes)")
+        
+        response.update({
+            "results": results,
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        })
+        return JSONResponse(content=response)
+        
+    except Exception as e:
+        LOGGER.error(f"Error generating TTS batch: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Query, HTTPException, Request
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse
 import os
 import re
 import asyncio
@@ -9,17 +9,92 @@ import time
 import uuid
 import shutil
 from urllib.parse import urljoin, urlparse, unquote
+from collections import OrderedDict, deque
 from typing import Dict, Set
 
 import aiohttp
 import aiofiles
 from bs4 import BeautifulSoup
+from utils import LOGGER, ArtifactStore, DiskCache, SharedSession, SingleFlight, on_shutdown, serve_file
 
 router = APIRouter(prefix="/web", tags=["Web Source Downloader"])
 
-STORE: Dict[str, Dict] = {}
 BASE_DIR = "/tmp/websource_files"
-os.makedirs(BASE_DIR, exist_ok=True)
+FILE_EXPIRY = 300
+STORE = ArtifactStore("web", BASE_DIR, FILE_EXPIRY)
+
+ASSET_CACHE_DIR = "/tmp/websource_cache"
+ASSET_CACHE_MAX_BYTES = 512 * 1024 * 1024
+ASSET_FRESH_SECONDS = 600
+ASSET_MAX_FRESH_SECONDS = 86400
+ASSET_CACHE = DiskCache(ASSET_CACHE_DIR, ASSET_CACHE_MAX_BYTES, name="web asset cache")
+ASSET_FLIGHTS = SingleFlight()
+ASSET_HTTP = SharedSession(limit=150, limit_per_host=50, timeout=120, auto_decompress=False)
+
+ASSET_DEADLINE = 20
+HOST_MIN_CONCURRENCY = 2
+HOST_INITIAL_CONCURRENCY = 6
+HOST_MAX_CONCURRENCY = 16
+HOST_LIMITERS_MAX = 1024
+HOST_LIMITERS: "OrderedDict[str, HostLimiter]" = OrderedDict()
+
+JOB_WORKERS = 3
+JOB_QUEUE_MAX = 50
+JOB_RETENTION = 900
+JOBS: Dict[str, Dict] = {}
+JOB_QUEUE = None
+JOB_WORKER_TASKS = []
+
+class AssetThrottled(Exception):
+    pass
+
+class HostLimiter:
+    def __init__(self):
+        self.window = float(HOST_INITIAL_CONCURRENCY)
+        self.latency = None
+        self.best_latency = None
+        self.active = 0
+        self.condition = None
+
+    @property
+    def limit(self):
+        return max(HOST_MIN_CONCURRENCY, min(HOST_MAX_CONCURRENCY, int(self.window)))
+
+    async def acquire(self):
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        async with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def record_success(self, latency):
+        self.latency = latency if self.latency is None else self.latency * 0.8 + latency * 0.2
+        self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+        if self.latency > max(self.best_latency * 4, 1.0):
+            self.window = max(HOST_MIN_CONCURRENCY, self.window - 0.5)
+        else:
+            self.window = min(HOST_MAX_CONCURRENCY, self.window + 1 / self.window)
+
+    def record_failure(self):
+        self.window = max(HOST_MIN_CONCURRENCY, self.window / 2)
+
+def get_host_limiter(host):
+    limiter = HOST_LIMITERS.get(host)
+    if limiter is None:
+        limiter = HOST_LIMITERS[host] = HostLimiter()
+        while len(HOST_LIMITERS) > HOST_LIMITERS_MAX:
+            idle_host = next((name for name, item in HOST_LIMITERS.items() if not item.active), None)
+            if idle_host is None:
+                break
+            del HOST_LIMITERS[idle_host]
+    else:
+        HOST_LIMITERS.move_to_end(host)
+    return limiter
 
 class UrlDownloader:
     def __init__(self, imgFlg=True, linkFlg=True, scriptFlg=True):
@@ -41,6 +116,7 @@ class UrlDownloader:
         self.semaphore = asyncio.Semaphore(25)
         self.downloaded_files: Set[str] = set()
         self.failed_urls: Set[str] = set()
+        self.progress = {"discovered": 0, "downloaded": 0, "failed": 0, "bytes": 0}
 
     async def savePage(self, url, pagefolder='page', session=None):
         try:
@@ -215,7 +291,7 @@ class UrlDownloader:
         return urls
 
     async def _download_all_resources(self, resource_urls, pagefolder, session):
-        tasks = []
+        host_queues: Dict[str, deque] = {}
         file_paths = []
         for resource_url in resource_urls:
             if resource_url not in self.downloaded_files and resource_url not in self.failed_urls:
@@ -223,14 +299,25 @@ class UrlDownloader:
                 file_path = self._get_resource_path(resource_url, pagefolder)
                 if file_path:
                     file_paths.append(file_path)
-                    tasks.append(self._download_single_resource(resource_url, file_path, session))
-        if tasks:
-            batch_size = 25
-            for i in range(0, len(tasks), batch_size):
-                await asyncio.gather(*tasks[i:i+batch_size], return_exceptions=True)
-                await asyncio.sleep(0.2)
+                    self.progress["discovered"] += 1
+                    host = urlparse(resource_url).netloc.lower()
+                    host_queues.setdefault(host, deque()).append((resource_url, file_path))
+        if host_queues:
+            await asyncio.gather(
+                *(self._drain_host_queue(host, queue, session) for host, queue in host_queues.items()),
+                return_exceptions=True
+            )
         return file_paths
 
+    async def _drain_host_queue(self, host, queue, session):
+        limiter = get_host_limiter(host)
+        running = set()
+        while queue or running:
+            while queue and len(running) < limiter.limit:
+                resource_url, file_path = queue.popleft()
+                running.add(asyncio.ensure_future(self._download_single_resource(resource_url, file_path, session, limiter)))
+            _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
     def _get_resource_path(self, resource_url, pagefolder):
         try:
             parsed_url = urlparse(resource_url)
@@ -295,39 +382,113 @@ class UrlDownloader:
             return 'xml'
         return None
 
-    async def _download_single_resource(self, resource_url, file_path, session):
+    async def _download_single_resource(self, resource_url, file_path, session, limiter=None):
         async with self.semaphore:
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept': '*/*',
-                    'Accept-Encoding': 'identity',
-                    'Cache-Control': 'no-cache',
-                    'Referer': resource_url
-                }
-                async with session.get(resource_url, timeout=15, headers=headers, allow_redirects=True) as response:
-                    if response.status not in [200, 206]:
-                        self.failed_urls.add(resource_url)
-                        return False
-                    content = await response.read()
-                    if len(content) > self.size_limit or len(content) == 0:
-                        self.failed_urls.add(resource_url)
-                        return False
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    if file_path.endswith('.css'):
-                        try:
-                            decoded_content = content.decode('utf-8', errors='ignore')
-                            processed_content = await self._process_css_content(decoded_content, resource_url, session)
-                            content = processed_content.encode('utf-8')
-                        except:
-                            pass
-                    async with aiofiles.open(file_path, 'wb') as file:
-                        await file.write(content)
-                    return True
+                if limiter:
+                    await limiter.acquire()
+                try:
+                    started = time.monotonic()
+                    content = await asyncio.wait_for(self._fetch_resource(resource_url), ASSET_DEADLINE)
+                except (asyncio.TimeoutError, aiohttp.ClientError, AssetThrottled):
+                    if limiter:
+                        limiter.record_failure()
+                    raise
+                finally:
+                    if limiter:
+                        await limiter.release()
+                if limiter:
+                    limiter.record_success(time.monotonic() - started)
+                if content is None:
+                    self.failed_urls.add(resource_url)
+                    self.progress["failed"] += 1
+                    return False
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                if file_path.endswith('.css'):
+                    try:
+                        decoded_content = content.decode('utf-8', errors='ignore')
+                        processed_content = await self._process_css_content(decoded_content, resource_url, session)
+                        content = processed_content.encode('utf-8')
+                    except:
+                        pass
+                async with aiofiles.open(file_path, 'wb') as file:
+                    await file.write(content)
+                self.progress["downloaded"] += 1
+                self.progress["bytes"] += len(content)
+                return True
             except:
                 self.failed_urls.add(resource_url)
+                self.progress["failed"] += 1
                 return False
 
+    async def _fetch_resource(self, resource_url):
+        cached = ASSET_CACHE.get(resource_url)
+        if cached and time.time() < cached["meta"].get("fresh_until", 0):
+            content = await self._read_cached_asset(cached)
+            if content is not None:
+                return content
+        return await ASSET_FLIGHTS.run(resource_url, self._fetch_remote_resource, resource_url)
+
+    async def _fetch_remote_resource(self, resource_url):
+        cached = ASSET_CACHE.get(resource_url)
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': '*/*',
+            'Accept-Encoding': 'identity',
+            'Cache-Control': 'no-cache',
+            'Referer': resource_url
+        }
+        if cached:
+            if cached["meta"].get("etag"):
+                headers['If-None-Match'] = cached["meta"]["etag"]
+            if cached["meta"].get("last_modified"):
+                headers['If-Modified-Since'] = cached["meta"]["last_modified"]
+        async with ASSET_HTTP.get().get(resource_url, timeout=15, headers=headers, allow_redirects=True) as response:
+            if response.status == 304 and cached:
+                ASSET_CACHE.update_meta(resource_url, fresh_until=self._asset_fresh_until(response.headers) or time.time())
+                return await self._read_cached_asset(cached)
+            if response.status == 429 or response.status >= 500:
+                raise AssetThrottled(f"HTTP {response.status}")
+            if response.status not in [200, 206]:
+                return None
+            content = await response.read()
+            if len(content) > self.size_limit or len(content) == 0:
+                return None
+            fresh_until = self._asset_fresh_until(response.headers)
+            if response.status == 200 and fresh_until is not None:
+                try:
+                    blob, size = await asyncio.to_thread(ASSET_CACHE.store_blob, content)
+                    ASSET_CACHE.commit(resource_url, blob, size, {
+                        "etag": response.headers.get('ETag'),
+                        "last_modified": response.headers.get('Last-Modified'),
+                        "content_type": response.headers.get('Content-Type'),
+                        "fresh_until": fresh_until
+                    })
+                except Exception as e:
+                    LOGGER.warning(f"Failed to cache asset {resource_url}: {str(e)}")
+            return content
+
+    def _asset_fresh_until(self, headers):
+        cache_control = headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control or 'private' in cache_control:
+            return None
+        if 'no-cache' in cache_control:
+            return time.time()
+        max_age = re.search(r'max-age=(\d+)', cache_control)
+        if max_age:
+            return time.time() + min(int(max_age.group(1)), ASSET_MAX_FRESH_SECONDS)
+        if not headers.get('ETag') and not headers.get('Last-Modified'):
+            return time.time() + ASSET_FRESH_SECONDS // 10
+        return time.time() + ASSET_FRESH_SECONDS
+
+    async def _read_cached_asset(self, cached):
+        try:
+            async with aiofiles.open(cached["path"], 'rb') as file:
+                return await file.read()
+        except OSError:
+            ASSET_CACHE.discard(cached["key"])
+            return None
+
     async def _process_css_content(self, css_content, base_url, session):
         def replace_url(match):
             url = match.group(1).strip('\'"')
@@ -407,19 +568,13 @@ def create_zip(folder_path):
     except:
         return None
 
-@router.get("/source")
-async def download_website_source(request: Request, url: str = Query(..., description="Website URL to download")):
+async def build_website_archive(url, fid, downloader, base_url):
     start_time = time.time()
-    if not url.startswith(('http://', 'https://')):
-        url = f"https://{url}"
-    fid = uuid.uuid4().hex
     pagefolder = os.path.join(BASE_DIR, f"page_{fid}")
-    base_url = str(request.base_url).rstrip('/')
     try:
         connector = aiohttp.TCPConnector(limit=150, limit_per_host=50, ttl_dns_cache=300)
         timeout = aiohttp.ClientTimeout(total=120, connect=20, sock_read=15)
         async with aiohttp.ClientSession(connector=connector, timeout=timeout, auto_decompress=False) as session:
-            downloader = UrlDownloader()
             success, error, file_paths = await downloader.savePage(url, pagefolder, session)
             if not success:
                 if file_paths:
@@ -428,16 +583,13 @@ async def download_website_source(request: Request, url: str = Query(..., descri
                             os.remove(fp)
                         except:
                             pass
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "success": False,
-                        "error": error,
-                        "api_dev": "@ISmartCoder",
-                        "api_updates": "@abirxdhackz"
-                    }
-                )
-            zip_file_path = create_zip(pagefolder)
+                return 400, {
+                    "success": False,
+                    "error": error,
+                    "api_dev": "@ISmartCoder",
+                    "api_updates": "@abirxdhackz"
+                }
+            zip_file_path = await asyncio.to_thread(create_zip, pagefolder)
             for fp in file_paths:
                 try:
                     os.remove(fp)
@@ -448,26 +600,18 @@ async def download_website_source(request: Request, url: str = Query(..., descri
             except:
                 pass
             if not zip_file_path:
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "success": False,
-                        "error": "Failed to create zip archive",
-                        "api_dev": "@ISmartCoder",
-                        "api_updates": "@abirxdhackz"
-                    }
-                )
-            expiry = time.time() + 300
-            STORE[fid] = {
-                "path": zip_file_path,
-                "exp": expiry,
-                "folder": pagefolder
-            }
+                return 500, {
+                    "success": False,
+                    "error": "Failed to create zip archive",
+                    "api_dev": "@ISmartCoder",
+                    "api_updates": "@abirxdhackz"
+                }
+            STORE.register(zip_file_path, fid=fid, folder=pagefolder)
             zip_size = os.path.getsize(zip_file_path)
             domain = urlparse(url).netloc.replace('www.', '')
             time_taken = time.time() - start_time
             download_url = f"{base_url}/web/download/{fid}"
-            return JSONResponse(content={
+            return 200, {
                 "success": True,
                 "file_id": fid,
                 "download_url": download_url,
@@ -475,43 +619,158 @@ async def download_website_source(request: Request, url: str = Query(..., descri
                 "file_size_mb": round(zip_size / (1024 * 1024), 2),
                 "file_count": len(file_paths),
                 "time_taken_seconds": round(time_taken, 2),
-                "expires_in_seconds": 300,
+                "expires_in_seconds": FILE_EXPIRY,
                 "api_dev": "@ISmartCoder",
                 "api_updates": "@abirxdhackz"
-            })
+            }
     except Exception as e:
         try:
             if os.path.exists(pagefolder):
                 shutil.rmtree(pagefolder, ignore_errors=True)
         except:
             pass
+        return 500, {
+            "success": False,
+            "error": str(e),
+            "api_dev": "@ISmartCoder",
+            "api_updates": "@abirxdhackz"
+        }
+
+def prune_jobs():
+    now = time.time()
+    for job_id in [job_id for job_id, job in JOBS.items() if job["finished"] and now - job["finished"] > JOB_RETENTION]:
+        JOBS.pop(job_id, None)
+
+def ensure_job_workers():
+    global JOB_QUEUE
+    if JOB_QUEUE is None:
+        JOB_QUEUE = asyncio.Queue(maxsize=JOB_QUEUE_MAX)
+    JOB_WORKER_TASKS[:] = [task for task in JOB_WORKER_TASKS if not task.done()]
+    while len(JOB_WORKER_TASKS) < JOB_WORKERS:
+        JOB_WORKER_TASKS.append(asyncio.ensure_future(job_worker()))
+    return JOB_QUEUE
+
+async def job_worker():
+    while True:
+        job_id = await JOB_QUEUE.get()
+        job = JOBS.get(job_id)
+        try:
+            if job:
+                job["status"] = "running"
+                job["started"] = time.time()
+                LOGGER.info(f"Website archive job {job_id} started for {job['url']}")
+                status_code, result = await build_website_archive(job["url"], job_id, job["downloader"], job["base_url"])
+                job["status"] = "completed" if status_code == 200 else "failed"
+                job["status_code"] = status_code
+                job["result"] = result
+        except Exception as e:
+            LOGGER.error(f"Website archive job {job_id} crashed: {str(e)}")
+            if job:
+                job["status"] = "failed"
+                job["status_code"] = 500
+                job["result"] = {
+                    "success": False,
+                    "error": str(e),
+                    "api_dev": "@ISmartCoder",
+                    "api_updates": "@abirxdhackz"
+                }
+        finally:
+            if job:
+                job["progress"] = dict(job.pop("downloader").progress)
+                job["finished"] = time.time()
+                job["done"].set()
+            JOB_QUEUE.task_done()
+            prune_jobs()
+
+def submit_job(url, base_url):
+    prune_jobs()
+    queue = ensure_job_workers()
+    fid = uuid.uuid4().hex
+    downloader = UrlDownloader()
+    job = {
+        "id": fid,
+        "url": url,
+        "base_url": base_url,
+        "downloader": downloader,
+        "progress": downloader.progress,
+        "status": "queued",
+        "status_code": None,
+        "result": None,
+        "created": time.time(),
+        "started": None,
+        "finished": None,
+        "done": asyncio.Event()
+    }
+    try:
+        queue.put_nowait(fid)
+    except asyncio.QueueFull:
+        return None
+    JOBS[fid] = job
+    return job
+
+def job_status(job, base_url):
+    content = {
+        "success": job["status"] != "failed",
+        "job_id": job["id"],
+        "status": job["status"],
+        "url": job["url"],
+        "progress": dict(job["progress"]),
+        "status_url": f"{base_url}/web/jobs/{job['id']}",
+        "elapsed_seconds": round((job["finished"] or time.time()) - job["created"], 2),
+        "api_dev": "@ISmartCoder",
+        "api_updates": "@abirxdhackz"
+    }
+    if job["result"] is not None:
+        content["result"] = job["result"]
+    return content
+
+@router.get("/source")
+async def download_website_source(
+    request: Request,
+    url: str = Query(..., description="Website URL to download"),
+    background: bool = Query(False, description="Return a job id immediately and poll /web/jobs/{job_id}")
+):
+    if not url.startswith(('http://', 'https://')):
+        url = f"https://{url}"
+    base_url = str(request.base_url).rstrip('/')
+    job = submit_job(url, base_url)
+    if job is None:
         return JSONResponse(
-            status_code=500,
+            status_code=429,
+            headers={"Retry-After": "30"},
             content={
                 "success": False,
-                "error": str(e),
+                "error": "Too many website downloads queued, try again later",
                 "api_dev": "@ISmartCoder",
                 "api_updates": "@abirxdhackz"
             }
         )
+    if background:
+        return JSONResponse(status_code=202, content=job_status(job, base_url))
+    await job["done"].wait()
+    return JSONResponse(status_code=job["status_code"], content=job["result"])
+
+@router.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str):
+    prune_jobs()
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return JSONResponse(content=job_status(job, str(request.base_url).rstrip('/')))
 
 @router.get("/download/{file_id}")
-async def download_file(file_id: str):
-    if file_id not in STORE:
+async def download_file(request: Request, file_id: str):
+    data = STORE.get(file_id)
+    if not data:
         raise HTTPException(status_code=404, detail="File not found or expired")
-    data = STORE[file_id]
-    if time.time() > data["exp"]:
-        try:
-            os.remove(data["path"])
-        except:
-            pass
-        STORE.pop(file_id, None)
-        raise HTTPException(status_code=404, detail="File expired")
-    if not os.path.exists(data["path"]):
-        STORE.pop(file_id, None)
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(
+    return serve_file(
+        request,
         data["path"],
         media_type="application/zip",
-        filename=f"website_source_{file_id}.zip"
+        filename=f"website_source_{file_id}.zip",
+        max_age=STORE.remaining(file_id)
     )
+
+@on_shutdown
+async def close_asset_http():
+    await ASSET_HTTP.close()
@@ -1,29 +1,56 @@
-import subprocess
 import os
+import math
 import platform
 import shutil
+from contextlib import asynccontextmanager
 from datetime import datetime
 import asyncio
 from pathlib import Path
 import time
 import uuid
 import tempfile
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
-from utils import LOGGER
-
-try:
-    import cloudscraper
-    CLOUDSCRAPER_AVAILABLE = True
-except ImportError:
-    CLOUDSCRAPER_AVAILABLE = False
-    LOGGER.warning("Cloudscraper not installed - Cloudflare bypass unavailable")
+import json
+import zipfile
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from utils import (
+    CLOUDSCRAPER_AVAILABLE,
+    LOGGER,
+    ArtifactStore,
+    BrowserPool,
+    CDPError,
+    DiskCache,
+    ScraperPool,
+    SelectorNotFound,
+    SingleFlight,
+    on_shutdown,
+    resize_image_async,
+    serve_file
+)
 
 router = APIRouter(prefix="/webss")
 
 SCREENSHOT_DIR = Path("/tmp/screenshots")
-STORE = {}
 FILE_EXPIRY = 60
+STORE = ArtifactStore("webss", SCREENSHOT_DIR, FILE_EXPIRY, exclude=("cache",))
+SHOT_CACHE = DiskCache(SCREENSHOT_DIR / "cache", int(os.getenv("SHOT_CACHE_MB", "256")) * 1024 * 1024, name="screenshot cache")
+SHOT_FLIGHTS = SingleFlight()
+SHOT_CACHE_DEFAULT_AGE = 300
+SHOT_CACHE_MAX_AGE = 86400
+CAPTURE_TIMEOUT = 30
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_CAPTURES = int(os.getenv("BROWSER_MAX_CAPTURES", "50"))
+CAPTURE_MEMORY_PER_SLOT = 300 * 1024 * 1024
+CAPTURE_MAX_SLOTS = int(os.getenv("CAPTURE_MAX_SLOTS", "8"))
+CAPTURE_QUEUE_MAX = int(os.getenv("CAPTURE_QUEUE_MAX", "20"))
+CAPTURE_QUEUE_WAIT = 15
+BATCH_MAX_URLS = int(os.getenv("SCREENSHOT_BATCH_MAX", "50"))
+DERIVATIVE_MAX_DIMENSION = 4096
+DERIVATIVE_QUALITY = 80
+DERIVATIVE_FLIGHTS = SingleFlight()
 
 QUALITY_SETTINGS = {
     "low": {"width": 1280, "height": 720},
@@ -32,7 +59,23 @@ QUALITY_SETTINGS = {
     "wqhd": {"width": 2560, "height": 1440}
 }
 
-SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
+IMAGE_FORMATS = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp"
+}
+
+class ScreenshotBatchRequest(BaseModel):
+    urls: List[str]
+    quality: str = "hd"
+    bypass: bool = False
+    max_age: int = SHOT_CACHE_DEFAULT_AGE
+    format: str = "png"
+    image_quality: int = 80
+    full_page: bool = False
+    selector: Optional[str] = None
+    scale: float = 1.0
+    archive: bool = False
 
 def find_browser():
     system = platform.system()
@@ -71,23 +114,153 @@ def find_browser():
     
     return None
 
+CGROUP_MEMORY_FILES = [
+    ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+    ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes")
+]
+CGROUP_UNLIMITED = 1 << 60
+
+def cgroup_memory_headroom():
+    for limit_path, usage_path in CGROUP_MEMORY_FILES:
+        try:
+            with open(limit_path) as f:
+                limit = f.read().strip()
+            if limit == "max" or int(limit) >= CGROUP_UNLIMITED:
+                continue
+            with open(usage_path) as f:
+                usage = int(f.read().strip())
+            return max(int(limit) - usage, 0)
+        except (OSError, ValueError):
+            continue
+    return None
+
+def meminfo_available():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def available_memory_bytes():
+    candidates = [value for value in (cgroup_memory_headroom(), meminfo_available()) if value is not None]
+    return min(candidates) if candidates else None
+
+def capture_slot_count():
+    available = available_memory_bytes()
+    if available is None:
+        return 2
+    return max(1, min(CAPTURE_MAX_SLOTS, available // CAPTURE_MEMORY_PER_SLOT))
+
+class CaptureRejected(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CaptureScheduler:
+    def __init__(self, slots, queue_max, max_wait):
+        self.slots = slots
+        self.queue_max = queue_max
+        self.max_wait = max_wait
+        self.semaphore = asyncio.Semaphore(slots)
+        self.waiting = 0
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+        self.avg_capture = 5.0
+
+    def retry_after(self):
+        return max(1, math.ceil((self.waiting + 1) / self.slots * self.avg_capture))
+
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+        else:
+            if self.waiting >= self.queue_max:
+                self.rejected += 1
+                raise CaptureRejected("Screenshot queue is full", self.retry_after())
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise CaptureRejected(f"Waited {self.max_wait}s for a free screenshot slot", self.retry_after())
+            finally:
+                self.waiting -= 1
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_observed_wait = max(self.max_observed_wait, waited)
+        self.active += 1
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+            self.avg_capture = self.avg_capture * 0.8 + (time.monotonic() - started) * 0.2
+
+    def stats(self):
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "queue_max": self.queue_max,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": round(self.total_wait / self.admitted, 3) if self.admitted else 0,
+            "max_wait_seconds": round(self.max_observed_wait, 3),
+            "avg_capture_seconds": round(self.avg_capture, 3)
+        }
+
+CAPTURE_SCHEDULER = CaptureScheduler(capture_slot_count(), CAPTURE_QUEUE_MAX, CAPTURE_QUEUE_WAIT)
+BROWSER_POOL = BrowserPool(
+    find_browser,
+    size=BROWSER_POOL_SIZE,
+    tabs_per_browser=math.ceil(CAPTURE_SCHEDULER.slots / BROWSER_POOL_SIZE),
+    max_captures=BROWSER_MAX_CAPTURES
+)
+LOGGER.info(f"Screenshot capture slots: {CAPTURE_SCHEDULER.slots} across {BROWSER_POOL_SIZE} browsers")
+BYPASS_SCRAPERS = ScraperPool(
+    "webss",
+    browser={
+        'browser': 'chrome',
+        'platform': 'windows',
+        'mobile': False
+    },
+    size=int(os.getenv("BYPASS_SCRAPER_POOL_SIZE", "4")),
+    warm=2
+)
+
+def rejected_response(error: CaptureRejected):
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(error.retry_after)},
+        content={
+            "error": str(error),
+            "retry_after": error.retry_after,
+            "queue_depth": CAPTURE_SCHEDULER.waiting,
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        }
+    )
+
 async def bypass_cloudflare(url):
     if not CLOUDSCRAPER_AVAILABLE:
         return None
     
     try:
-        scraper = cloudscraper.create_scraper(
-            browser={
-                'browser': 'chrome',
-                'platform': 'windows',
-                'mobile': False
-            }
-        )
-        
         LOGGER.info(f"Attempting Cloudflare bypass for: {url}")
         
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: scraper.get(url, timeout=15))
+        response = await BYPASS_SCRAPERS.get(url, timeout=15)
         
         if response.status_code == 200:
             temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, dir='/tmp')
@@ -101,29 +274,192 @@ async def bypass_cloudflare(url):
     
     return None
 
-def cleanup_expired_files_sync():
+def normalize_url(url):
+    parsed = urlsplit(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    port = parsed.port
+    netloc = host if port is None or (scheme, port) in (("http", 80), ("https", 443)) else f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parsed.path or "/", query, ""))
+
+def capture_options(image_format="png", image_quality=80, full_page=False, selector=None, scale=1.0):
+    image_format = image_format.lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Invalid format. Choose from: {', '.join(IMAGE_FORMATS.keys())}")
+    if not 1 <= image_quality <= 100:
+        raise ValueError("image_quality must be between 1 and 100")
+    if not 0.5 <= scale <= 3:
+        raise ValueError("scale must be between 0.5 and 3")
+    selector = selector.strip() if selector else None
+    if selector and len(selector) > 512:
+        raise ValueError("selector is too long")
+    return {
+        "format": image_format,
+        "quality": image_quality if image_format != "png" else None,
+        "full_page": bool(full_page) and not selector,
+        "selector": selector,
+        "scale": round(scale, 2)
+    }
+
+def screenshot_cache_key(url, quality, bypass, options):
+    mode = f"selector:{options['selector']}" if options["selector"] else ("full" if options["full_page"] else "viewport")
+    return f"{normalize_url(url)}|{quality}|{'bypass' if bypass else 'direct'}|{options['format']}:{options['quality']}|{mode}|{options['scale']}"
+
+async def capture_screenshot(url, quality, bypass, cache_key, options):
+    target_url = url
+    temp_html_file = None
+    
+    if bypass and CLOUDSCRAPER_AVAILABLE:
+        temp_html_file = await bypass_cloudflare(url)
+        if temp_html_file:
+            target_url = f"file://{temp_html_file}"
+    elif bypass and not CLOUDSCRAPER_AVAILABLE:
+        LOGGER.warning("Cloudflare bypass requested but cloudscraper not installed")
+    
+    dimensions = QUALITY_SETTINGS[quality]
+    width = dimensions["width"]
+    height = dimensions["height"]
+    
+    LOGGER.info(f"Capturing {quality.upper()} {options['format'].upper()} screenshot ({width}x{height} @{options['scale']}x) for: {url}")
+    
     try:
-        now = time.time()
-        dead_keys = []
-        
-        for fid, data in list(STORE.items()):
-            if now > data["exp"]:
-                try:
-                    if os.path.exists(data["path"]):
-                        os.remove(data["path"])
-                        LOGGER.info(f"Deleted expired screenshot: {os.path.basename(data['path'])}")
-                except Exception as e:
-                    LOGGER.error(f"Error deleting file: {str(e)}")
-                dead_keys.append(fid)
-        
-        for fid in dead_keys:
-            STORE.pop(fid, None)
-            
-    except Exception as e:
-        LOGGER.error(f"Cleanup error: {str(e)}")
+        async with CAPTURE_SCHEDULER.slot() as waited:
+            if waited > 1:
+                LOGGER.info(f"Screenshot for {url} waited {waited:.2f}s for a capture slot")
+            image = await asyncio.wait_for(
+                BROWSER_POOL.capture(target_url, width, height, options=options),
+                timeout=CAPTURE_TIMEOUT
+            )
+    finally:
+        if temp_html_file and os.path.exists(temp_html_file):
+            os.remove(temp_html_file)
+    
+    if not image:
+        raise CDPError("Browser returned an empty screenshot")
+    
+    blob, size = await asyncio.to_thread(SHOT_CACHE.store_blob, image)
+    return SHOT_CACHE.commit(cache_key, blob, size, {"url": url, "quality": quality, "format": options["format"]})
+
+async def get_screenshot(url, quality, bypass, max_age, options):
+    cache_key = screenshot_cache_key(url, quality, bypass, options)
+    cached = SHOT_CACHE.get(cache_key)
+    if cached and time.time() - cached["stored"] <= max_age:
+        return cached, True
+    return await SHOT_FLIGHTS.run(cache_key, capture_screenshot, url, quality, bypass, cache_key, options), False
+
+def screenshot_name(url, quality, options):
+    domain = url.split('//')[-1].split('/')[0].replace('www.', '').replace('.', '_')
+    extension = "jpg" if options["format"] == "jpeg" else options["format"]
+    return f"{domain}_{quality}.{extension}"
+
+def public_file_url(request, fid):
+    return f"{str(request.base_url).rstrip('/')}/webss/file/{fid}"
+
+def link_screenshot(record, output_path):
+    try:
+        os.link(record["path"], output_path)
+    except OSError:
+        shutil.copyfile(record["path"], output_path)
+    return output_path.stat().st_size
+
+async def publish_screenshot(record, url, quality, options):
+    fid = uuid.uuid4().hex
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    name, extension = screenshot_name(url, quality, options).rsplit(".", 1)
+    filename = f"{fid}_{name}_{timestamp}.{extension}"
+    output_path = SCREENSHOT_DIR / filename
+    file_size = await asyncio.to_thread(link_screenshot, record, output_path)
+    STORE.register(output_path, fid=fid, filename=filename, media_type=IMAGE_FORMATS[options["format"]])
+    return fid, filename, file_size
+
+def capture_error_response(url, error):
+    if isinstance(error, SelectorNotFound):
+        return JSONResponse(
+            status_code=404,
+            content={
+                "error": str(error),
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    if isinstance(error, CaptureRejected):
+        LOGGER.warning(f"Screenshot rejected for {url}: {str(error)}")
+        return rejected_response(error)
+    if isinstance(error, asyncio.TimeoutError):
+        return JSONResponse(
+            status_code=504,
+            content={
+                "error": f"Screenshot timeout ({CAPTURE_TIMEOUT} seconds)",
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
+        )
+    LOGGER.error(f"Browser capture failed for {url}: {str(error)}")
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": "Failed to generate screenshot",
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        }
+    )
+
+def write_archive(output_path, results, quality, options):
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as zip_file:
+        for index, (url, record) in enumerate(results, 1):
+            zip_file.write(record["path"], f"{index:03d}_{screenshot_name(url, quality, options)}")
+    return output_path.stat().st_size
+
+async def publish_archive(results, quality, options):
+    fid = uuid.uuid4().hex
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{fid}_screenshots_{quality}_{timestamp}.zip"
+    output_path = SCREENSHOT_DIR / filename
+    file_size = await asyncio.to_thread(write_archive, output_path, results, quality, options)
+    STORE.register(output_path, fid=fid, filename=filename, media_type="application/zip")
+    return fid, filename, file_size
+
+async def capture_batch_item(url, quality, bypass, max_age, options, limiter):
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    async with limiter:
+        try:
+            record, cached = await get_screenshot(url, quality, bypass, max_age, options)
+        except (CaptureRejected, asyncio.TimeoutError, CDPError) as e:
+            response = capture_error_response(url, e)
+            return url, None, {
+                "url": url,
+                "success": False,
+                "status": response.status_code,
+                "error": json.loads(response.body)["error"]
+            }
+        except Exception as e:
+            LOGGER.error(f"Batch screenshot error for {url}: {str(e)}")
+            return url, None, {"url": url, "success": False, "status": 500, "error": str(e)}
+    return url, record, {
+        "url": url,
+        "success": True,
+        "cached": cached,
+        "size_bytes": record["size"],
+        "captured_at": datetime.utcfromtimestamp(record["stored"]).strftime("%Y-%m-%d %H:%M:%S UTC")
+    }
 
 @router.get("/shot")
-async def screenshot_endpoint(url: str, quality: str = "hd", bypass: bool = False):
+async def screenshot_endpoint(
+    request: Request,
+    url: str,
+    quality: str = "hd",
+    bypass: bool = False,
+    max_age: int = SHOT_CACHE_DEFAULT_AGE,
+    format: str = "png",
+    image_quality: int = 80,
+    full_page: bool = False,
+    selector: str = None,
+    scale: float = 1.0
+):
     try:
         if not url:
             raise HTTPException(status_code=400, detail="URL parameter is required")
@@ -139,6 +475,18 @@ async def screenshot_endpoint(url: str, quality: str = "hd", bypass: bool = Fals
                 }
             )
         
+        try:
+            options = capture_options(format, image_quality, full_page, selector, scale)
+        except ValueError as e:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": str(e),
+                    "api_owner": "@ISmartCoder",
+                    "api_updates": "t.me/abirxdhackz"
+                }
+            )
+        
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
@@ -153,117 +501,155 @@ async def screenshot_endpoint(url: str, quality: str = "hd", bypass: bool = Fals
                 }
             )
         
-        target_url = url
-        temp_html_file = None
+        max_age = max(0, min(max_age, SHOT_CACHE_MAX_AGE))
         
-        if bypass and CLOUDSCRAPER_AVAILABLE:
-            temp_html_file = await bypass_cloudflare(url)
-            if temp_html_file:
-                target_url = f"file://{temp_html_file}"
-        elif bypass and not CLOUDSCRAPER_AVAILABLE:
-            LOGGER.warning("Cloudflare bypass requested but cloudscraper not installed")
+        try:
+            record, cached = await get_screenshot(url, quality, bypass, max_age, options)
+        except (CaptureRejected, asyncio.TimeoutError, CDPError) as e:
+            return capture_error_response(url, e)
         
+        fid, filename, file_size = await publish_screenshot(record, url, quality, options)
         dimensions = QUALITY_SETTINGS[quality]
-        width = dimensions["width"]
-        height = dimensions["height"]
+        file_url = public_file_url(request, fid)
         
-        fid = uuid.uuid4().hex
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        domain = url.split('//')[-1].split('/')[0].replace('www.', '').replace('.', '_')
-        filename = f"{fid}_{domain}_{quality}_{timestamp}.png"
-        output_path = SCREENSHOT_DIR / filename
-        
-        cmd = [
-            browser,
-            "--headless",
-            "--disable-gpu",
-            f"--screenshot={str(output_path)}",
-            f"--window-size={width},{height}",
-            "--hide-scrollbars",
-            "--disable-dev-shm-usage",
-            "--no-sandbox",
-            "--disable-software-rasterizer",
-            "--disable-extensions",
-            "--disable-background-networking",
-            "--disable-sync",
-            "--metrics-recording-only",
-            "--mute-audio",
-            target_url
-        ]
+        LOGGER.info(f"Screenshot {'served from cache' if cached else 'created'}: {filename} ({file_size} bytes) - expires in {FILE_EXPIRY}s")
         
-        LOGGER.info(f"Capturing {quality.upper()} screenshot ({width}x{height}) for: {url}")
+        return JSONResponse({
+            "success": True,
+            "url": url,
+            "quality": quality.upper(),
+            "resolution": f"{dimensions['width']}x{dimensions['height']}",
+            "format": options["format"],
+            "image_quality": options["quality"],
+            "full_page": options["full_page"],
+            "selector": options["selector"],
+            "scale": options["scale"],
+            "screenshot": file_url,
+            "file_id": fid,
+            "filename": filename,
+            "size_bytes": file_size,
+            "size_kb": round(file_size / 1024, 2),
+            "cloudflare_bypass": bypass and CLOUDSCRAPER_AVAILABLE,
+            "cached": cached,
+            "captured_at": datetime.utcfromtimestamp(record["stored"]).strftime("%Y-%m-%d %H:%M:%S UTC"),
+            "expires_in": f"{FILE_EXPIRY} seconds",
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+            "api_owner": "@ISmartCoder",
+            "api_updates": "t.me/abirxdhackz"
+        })
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+    except HTTPException:
+        raise
+    except Exception as e:
+        LOGGER.error(f"Screenshot error: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": str(e),
+                "api_owner": "@ISmartCoder",
+                "api_updates": "t.me/abirxdhackz"
+            }
         )
+
+@router.post("/batch")
+async def batch_screenshot_endpoint(request: Request, batch: ScreenshotBatchRequest):
+    try:
+        urls = list(dict.fromkeys(url.strip() for url in batch.urls if url and url.strip()))
+        if not urls:
+            raise HTTPException(status_code=400, detail="At least one URL is required")
+        if len(urls) > BATCH_MAX_URLS:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": f"Too many URLs. Maximum is {BATCH_MAX_URLS} per batch",
+                    "api_owner": "@ISmartCoder",
+                    "api_updates": "t.me/abirxdhackz"
+                }
+            )
         
-        try:
-            await asyncio.wait_for(process.wait(), timeout=30)
-        except asyncio.TimeoutError:
-            process.kill()
-            if temp_html_file and os.path.exists(temp_html_file):
-                os.remove(temp_html_file)
+        quality = batch.quality.lower()
+        if quality not in QUALITY_SETTINGS:
             return JSONResponse(
-                status_code=504,
+                status_code=400,
                 content={
-                    "error": "Screenshot timeout (30 seconds)",
+                    "error": f"Invalid quality. Choose from: {', '.join(QUALITY_SETTINGS.keys())}",
                     "api_owner": "@ISmartCoder",
                     "api_updates": "t.me/abirxdhackz"
                 }
             )
         
-        if temp_html_file and os.path.exists(temp_html_file):
-            os.remove(temp_html_file)
+        try:
+            options = capture_options(batch.format, batch.image_quality, batch.full_page, batch.selector, batch.scale)
+        except ValueError as e:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": str(e),
+                    "api_owner": "@ISmartCoder",
+                    "api_updates": "t.me/abirxdhackz"
+                }
+            )
         
-        if not output_path.exists():
+        if not find_browser():
             return JSONResponse(
                 status_code=500,
                 content={
-                    "error": "Failed to generate screenshot",
+                    "error": "No browser found on system. Install Chrome, Chromium, or Edge",
                     "api_owner": "@ISmartCoder",
                     "api_updates": "t.me/abirxdhackz"
                 }
             )
         
-        file_size = output_path.stat().st_size
-        expiry = time.time() + FILE_EXPIRY
+        max_age = max(0, min(batch.max_age, SHOT_CACHE_MAX_AGE))
+        limiter = asyncio.Semaphore(CAPTURE_SCHEDULER.slots)
+        started = time.monotonic()
+        outcomes = await asyncio.gather(*[
+            capture_batch_item(url, quality, batch.bypass, max_age, options, limiter) for url in urls
+        ])
         
-        STORE[fid] = {
-            "path": str(output_path),
-            "exp": expiry,
-            "filename": filename
+        captured = [(url, record) for url, record, _ in outcomes if record is not None]
+        results = [result for _, _, result in outcomes]
+        response = {
+            "success": bool(captured),
+            "quality": quality.upper(),
+            "format": options["format"],
+            "total": len(urls),
+            "captured": len(captured),
+            "failed": len(urls) - len(captured),
+            "duration_seconds": round(time.monotonic() - started, 2)
         }
         
-        from main import get_actual_ip
-        server_ip = get_actual_ip()
-        port = int(os.getenv("PORT", 4434))
-        file_url = f"http://{server_ip}:{port}/webss/file/{fid}"
-        
-        LOGGER.info(f"Screenshot created: {filename} ({file_size} bytes) - expires in {FILE_EXPIRY}s")
+        if batch.archive:
+            if captured:
+                fid, filename, file_size = await publish_archive(captured, quality, options)
+                response["archive"] = {
+                    "url": public_file_url(request, fid),
+                    "file_id": fid,
+                    "filename": filename,
+                    "size_bytes": file_size,
+                    "size_kb": round(file_size / 1024, 2)
+                }
+                LOGGER.info(f"Screenshot batch archive created: {filename} ({len(captured)} images, {file_size} bytes)")
+        else:
+            records = dict(captured)
+            for result in results:
+                if result["success"]:
+                    fid, filename, _ = await publish_screenshot(records[result["url"]], result["url"], quality, options)
+                    result.update({"screenshot": public_file_url(request, fid), "file_id": fid, "filename": filename})
         
-        return JSONResponse({
-            "success": True,
-            "url": url,
-            "quality": quality.upper(),
-            "resolution": f"{width}x{height}",
-            "screenshot": file_url,
-            "file_id": fid,
-            "filename": filename,
-            "size_bytes": file_size,
-            "size_kb": round(file_size / 1024, 2),
-            "cloudflare_bypass": bypass and CLOUDSCRAPER_AVAILABLE,
+        response.update({
+            "results": results,
             "expires_in": f"{FILE_EXPIRY} seconds",
             "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
             "api_owner": "@ISmartCoder",
             "api_updates": "t.me/abirxdhackz"
         })
+        return JSONResponse(response)
         
     except HTTPException:
         raise
     except Exception as e:
-        LOGGER.error(f"Screenshot error: {str(e)}")
+        LOGGER.error(f"Screenshot batch error: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={
@@ -273,31 +659,82 @@ async def screenshot_endpoint(url: str, quality: str = "hd", bypass: bool = Fals
             }
         )
 
+def image_format_for(media_type):
+    for image_format, known_type in IMAGE_FORMATS.items():
+        if known_type == media_type:
+            return image_format
+    return None
+
+async def create_derivative(data, derivative_id, width, height, image_format):
+    existing = STORE.get(derivative_id)
+    if existing:
+        return existing
+    extension = "jpg" if image_format == "jpeg" else image_format
+    stem = data["filename"].rsplit(".", 1)[0]
+    filename = f"{stem}_{width or 'auto'}x{height or 'auto'}.{extension}"
+    output_path = SCREENSHOT_DIR / filename
+    started = time.monotonic()
+    size = await resize_image_async(data["path"], str(output_path), width, height, image_format, DERIVATIVE_QUALITY)
+    STORE.register(
+        output_path,
+        fid=derivative_id,
+        expires_at=data["exp"],
+        filename=filename,
+        media_type=IMAGE_FORMATS[image_format],
+        parent=data["id"]
+    )
+    LOGGER.info(f"Screenshot derivative created: {filename} ({size} bytes) in {time.monotonic() - started:.2f}s")
+    return STORE.get(derivative_id)
+
 @router.get("/file/{fid}")
-async def get_file(fid: str):
-    cleanup_expired_files_sync()
+async def get_file(request: Request, fid: str, width: int = None, height: int = None, format: str = None):
+    data = STORE.get(fid)
     
-    if fid not in STORE:
-        raise HTTPException(status_code=404, detail="File not found")
+    if not data:
+        raise HTTPException(status_code=404, detail="File not found or expired")
     
-    data = STORE[fid]
+    source_format = image_format_for(data.get("media_type", "image/png"))
+    if source_format and (width or height or format):
+        image_format = (format or source_format).lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format not in IMAGE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Invalid format. Choose from: {', '.join(IMAGE_FORMATS.keys())}")
+        for value in (width, height):
+            if value is not None and not 1 <= value <= DERIVATIVE_MAX_DIMENSION:
+                raise HTTPException(status_code=400, detail=f"width and height must be between 1 and {DERIVATIVE_MAX_DIMENSION}")
+        if width or height or image_format != source_format:
+            derivative_id = f"{fid}_{width or 0}x{height or 0}_{image_format}"
+            try:
+                data = await DERIVATIVE_FLIGHTS.run(derivative_id, create_derivative, data, derivative_id, width, height, image_format)
+            except Exception as e:
+                LOGGER.error(f"Failed to create derivative for {fid}: {str(e)}")
+                raise HTTPException(status_code=500, detail="Failed to resize screenshot")
+            if not data:
+                raise HTTPException(status_code=404, detail="File not found or expired")
+            fid = derivative_id
     
-    if time.time() > data["exp"]:
-        try:
-            if os.path.exists(data["path"]):
-                os.remove(data["path"])
-                LOGGER.info(f"Deleted expired file on access: {os.path.basename(data['path'])}")
-        except Exception:
-            pass
-        STORE.pop(fid, None)
-        raise HTTPException(status_code=404, detail="File expired")
-    
-    if not os.path.exists(data["path"]):
-        STORE.pop(fid, None)
-        raise HTTPException(status_code=404, detail="File not found on disk")
-    
-    return FileResponse(
+    return serve_file(
+        request,
         data["path"],
-        media_type="image/png",
-        filename=data["filename"]
+        media_type=data.get("media_type", "image/png"),
+        filename=data["filename"],
+        max_age=STORE.remaining(fid)
     )
+
+@router.get("/stats")
+async def capture_stats():
+    return JSONResponse({
+        "scheduler": CAPTURE_SCHEDULER.stats(),
+        "browsers": BROWSER_POOL.stats(),
+        "store": STORE.metrics(),
+        "cache": SHOT_CACHE.stats(),
+        "bypass": BYPASS_SCRAPERS.stats(),
+        "api_owner": "@ISmartCoder",
+        "api_updates": "t.me/abirxdhackz"
+    })
+
+@on_shutdown
+async def close_capture_pools():
+    await BROWSER_POOL.close()
+    await BYPASS_SCRAPERS.close()
@@ -1,3 +1,13 @@
 #Copyright @ISmartCoder
 #Updates Channel @abirxdhackz 
 from .logger import LOGGER
+from .cache import DiskCache, SQLiteKV, SingleFlight, TieredCache, TTLCache, hash_key
+from .serving import precompress_json, serve_file, serve_payload
+from .artifacts import ARTIFACTS, ArtifactStore
+from .browser import BrowserPool, CDPError, SelectorNotFound
+from .imaging import image_executor, resize_image_async
+from .cards import create_weather_image
+from .scraper import CLOUDSCRAPER_AVAILABLE, ScraperPool
+from .http import SharedSession
+from .gemini import GeminiClient, GeminiError
+from .lifecycle import lifespan, on_shutdown, on_startup
@@ -0,0 +1,192 @@
+import asyncio
+import heapq
+import itertools
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+from .logger import LOGGER
+
+ARTIFACT_QUOTA_BYTES = int(os.getenv("ARTIFACT_QUOTA_MB", "2048")) * 1024 * 1024
+
+def remove_path(path):
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+        return True
+    except Exception as e:
+        LOGGER.error(f"Failed to remove artifact {path}: {str(e)}")
+        return False
+
+def path_size(path):
+    try:
+        if os.path.isdir(path):
+            return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+class ArtifactScheduler:
+    def __init__(self, quota_bytes: int):
+        self.quota_bytes = quota_bytes
+        self.heap = []
+        self.counter = itertools.count()
+        self.stores: Dict[str, "ArtifactStore"] = {}
+        self.total_bytes = 0
+        self.counters = {"registered": 0, "expired": 0, "evicted": 0, "removed": 0}
+        self.task = None
+        self.loop = None
+        self.wakeup = None
+
+    def schedule(self, store, fid, deadline):
+        heapq.heappush(self.heap, (deadline, next(self.counter), store.name, fid))
+        self._ensure_running()
+        if self.wakeup is not None and self.heap[0][0] == deadline:
+            self.wakeup.set()
+
+    def _ensure_running(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self.task is None or self.task.done() or self.loop is not loop:
+            self.loop = loop
+            self.wakeup = asyncio.Event()
+            self.task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self.expire_due()
+            timeout = max(self.heap[0][0] - time.time(), 0) if self.heap else None
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _live(self, item):
+        deadline, _, store_name, fid = item
+        store = self.stores.get(store_name)
+        entry = store.entries.get(fid) if store else None
+        if entry is None or entry["exp"] != deadline:
+            return None, None
+        return store, entry
+
+    def expire_due(self):
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            store, entry = self._live(heapq.heappop(self.heap))
+            if store is not None:
+                store._drop(entry["id"], "expired")
+
+    def enforce_quota(self, keep: Optional[str] = None):
+        skipped = []
+        while self.total_bytes > self.quota_bytes and self.heap:
+            item = heapq.heappop(self.heap)
+            store, entry = self._live(item)
+            if store is None:
+                continue
+            if entry["id"] == keep:
+                skipped.append(item)
+                continue
+            store._drop(entry["id"], "evicted")
+        for item in skipped:
+            heapq.heappush(self.heap, item)
+
+    def metrics(self) -> Dict:
+        return {
+            "bytes": self.total_bytes,
+            "quota_bytes": self.quota_bytes,
+            "scheduled": len(self.heap),
+            **self.counters,
+            "stores": {name: store.metrics() for name, store in self.stores.items()}
+        }
+
+ARTIFACTS = ArtifactScheduler(ARTIFACT_QUOTA_BYTES)
+
+class ArtifactStore:
+    def __init__(self, name: str, directory, ttl: int, scheduler: ArtifactScheduler = ARTIFACTS, exclude=()):
+        self.name = name
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.exclude = set(exclude)
+        self.scheduler = scheduler
+        self.entries: Dict[str, Dict] = {}
+        self.bytes = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        scheduler.stores[name] = self
+        self.purge_orphans()
+
+    def purge_orphans(self):
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path in self.directory.iterdir():
+            if path.name in self.exclude:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff and remove_path(str(path)):
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            LOGGER.info(f"Removed {removed} orphaned {self.name} artifacts from {self.directory}")
+
+    def register(self, path, ttl: Optional[int] = None, fid: Optional[str] = None, expires_at: Optional[float] = None, **meta) -> str:
+        fid = fid or uuid.uuid4().hex
+        if fid in self.entries:
+            self._drop(fid, "removed", delete=self.entries[fid]["path"] != str(path))
+        size = path_size(str(path))
+        deadline = expires_at if expires_at is not None else time.time() + (self.ttl if ttl is None else ttl)
+        self.entries[fid] = {**meta, "id": fid, "path": str(path), "exp": deadline, "size": size, "created": time.time()}
+        self.bytes += size
+        self.scheduler.total_bytes += size
+        self.scheduler.counters["registered"] += 1
+        self.scheduler.schedule(self, fid, deadline)
+        self.scheduler.enforce_quota(keep=fid)
+        return fid
+
+    def get(self, fid) -> Optional[Dict]:
+        self.scheduler.expire_due()
+        entry = self.entries.get(fid)
+        if entry is None:
+            return None
+        if time.time() > entry["exp"]:
+            self._drop(fid, "expired")
+            return None
+        if not os.path.exists(entry["path"]):
+            self._drop(fid, "removed", delete=False)
+            return None
+        return entry
+
+    def remove(self, fid):
+        if fid in self.entries:
+            self._drop(fid, "removed")
+
+    def remaining(self, fid) -> float:
+        entry = self.entries.get(fid)
+        return max(entry["exp"] - time.time(), 0) if entry else 0
+
+    def _drop(self, fid, reason, delete=True):
+        entry = self.entries.pop(fid, None)
+        if entry is None:
+            return
+        self.bytes -= entry["size"]
+        self.scheduler.total_bytes -= entry["size"]
+        self.scheduler.counters[reason] += 1
+        if delete:
+            remove_path(entry["path"])
+            LOGGER.info(f"Deleted {reason} {self.name} artifact: {os.path.basename(entry['path'])}")
+
+    def __contains__(self, fid):
+        return self.get(fid) is not None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def metrics(self) -> Dict:
+        return {"entries": len(self.entries), "bytes": self.bytes, "ttl": self.ttl}
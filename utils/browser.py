@@ -0,0 +1,409 @@
+import asyncio
+import atexit
+import base64
+import itertools
+import json
+import re
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+from .logger import LOGGER
+
+BROWSER_FLAGS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--hide-scrollbars",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-software-rasterizer",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--remote-debugging-port=0",
+    "--remote-allow-origins=*"
+]
+DEVTOOLS_PATTERN = re.compile(r"DevTools listening on (ws://\S+)")
+
+MAX_FULL_PAGE_HEIGHT = 16384
+ELEMENT_BOUNDS_SCRIPT = """(() => {
+    const element = document.querySelector(%s);
+    if (!element) return null;
+    element.scrollIntoView({block: "center"});
+    const rect = element.getBoundingClientRect();
+    return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+})()"""
+
+class CDPError(Exception):
+    pass
+
+class SelectorNotFound(CDPError):
+    pass
+
+class CDPConnection:
+    def __init__(self, session: aiohttp.ClientSession, ws):
+        self.session = session
+        self.ws = ws
+        self.ids = itertools.count(1)
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.listeners: Dict[tuple, List[asyncio.Future]] = {}
+        self.closed = False
+        self.reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, ws_url):
+        session = aiohttp.ClientSession()
+        try:
+            ws = await session.ws_connect(ws_url, max_msg_size=0, timeout=10)
+        except Exception:
+            await session.close()
+            raise
+        return cls(session, ws)
+
+    async def _read(self):
+        try:
+            async for message in self.ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(message.data)
+                if "id" in data:
+                    future = self.pending.pop(data["id"], None)
+                    if future and not future.done():
+                        if "error" in data:
+                            future.set_exception(CDPError(data["error"].get("message", "CDP error")))
+                        else:
+                            future.set_result(data.get("result", {}))
+                    continue
+                for future in self.listeners.pop((data.get("sessionId"), data.get("method")), []):
+                    if not future.done():
+                        future.set_result(data.get("params", {}))
+        except Exception as e:
+            LOGGER.warning(f"DevTools connection error: {str(e)}")
+        finally:
+            self.closed = True
+            for future in list(self.pending.values()) + [f for fs in self.listeners.values() for f in fs]:
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed"))
+            self.pending.clear()
+            self.listeners.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        if self.closed:
+            raise CDPError("DevTools connection closed")
+        message_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        try:
+            await self.ws.send_str(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(message_id, None)
+
+    def expect_event(self, method, session_id=None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.listeners.setdefault((session_id, method), []).append(future)
+        return future
+
+    def discard_event(self, method, session_id, future):
+        waiters = self.listeners.get((session_id, method))
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self.listeners[(session_id, method)]
+
+    async def close(self):
+        self.closed = True
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+        await self.session.close()
+        self.reader.cancel()
+
+class BrowserWorker:
+    def __init__(self, executable: str, index: int):
+        self.executable = executable
+        self.index = index
+        self.process = None
+        self.connection: Optional[CDPConnection] = None
+        self.profile_dir = None
+        self.stderr_task = None
+        self.active = 0
+        self.captures = 0
+        self.retiring = False
+
+    @property
+    def alive(self):
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and self.connection is not None
+            and not self.connection.closed
+        )
+
+    async def start(self, timeout=20):
+        self.profile_dir = tempfile.mkdtemp(prefix="browser_pool_")
+        self.process = await asyncio.create_subprocess_exec(
+            self.executable,
+            *BROWSER_FLAGS,
+            f"--user-data-dir={self.profile_dir}",
+            "about:blank",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            ws_url = await asyncio.wait_for(self._read_devtools_url(), timeout)
+            self.connection = await CDPConnection.connect(ws_url)
+        except BaseException:
+            await self.close()
+            raise
+        self.stderr_task = asyncio.ensure_future(self._drain_stderr())
+        LOGGER.info(f"Browser worker {self.index} started (pid {self.process.pid})")
+
+    async def _read_devtools_url(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                raise CDPError("Browser exited before DevTools became available")
+            match = DEVTOOLS_PATTERN.search(line.decode("utf-8", errors="ignore"))
+            if match:
+                return match.group(1)
+
+    async def _drain_stderr(self):
+        try:
+            while await self.process.stderr.readline():
+                pass
+        except Exception:
+            pass
+
+    async def capture(self, url, width, height, load_timeout=20, options=None):
+        options = options or {}
+        image_format = options.get("format", "png")
+        scale = options.get("scale", 1)
+        connection = self.connection
+        context = await connection.send("Target.createBrowserContext", {"disposeOnDetach": True})
+        context_id = context["browserContextId"]
+        try:
+            target = await connection.send("Target.createTarget", {
+                "url": "about:blank",
+                "browserContextId": context_id,
+                "width": width,
+                "height": height
+            })
+            attached = await connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+            session_id = attached["sessionId"]
+            await connection.send("Page.enable", session_id=session_id)
+            await connection.send("Emulation.setDeviceMetricsOverride", {
+                "width": width,
+                "height": height,
+                "deviceScaleFactor": scale,
+                "mobile": False
+            }, session_id=session_id)
+            loaded = connection.expect_event("Page.loadEventFired", session_id)
+            try:
+                navigation = await connection.send("Page.navigate", {"url": url}, session_id=session_id)
+                if navigation.get("errorText"):
+                    raise CDPError(f"Navigation failed: {navigation['errorText']}")
+                try:
+                    await asyncio.wait_for(loaded, load_timeout)
+                except asyncio.TimeoutError:
+                    LOGGER.warning(f"Load event timed out for {url}, capturing current state")
+            finally:
+                connection.discard_event("Page.loadEventFired", session_id, loaded)
+            params = {"format": image_format}
+            if image_format in ("jpeg", "webp"):
+                params["quality"] = options.get("quality", 80)
+            clip = await self._capture_clip(session_id, width, options)
+            if clip:
+                params["clip"] = clip
+                params["captureBeyondViewport"] = True
+            screenshot = await connection.send("Page.captureScreenshot", params, session_id=session_id)
+            return base64.b64decode(screenshot["data"])
+        finally:
+            self.captures += 1
+            if not connection.closed:
+                try:
+                    await connection.send("Target.disposeBrowserContext", {"browserContextId": context_id}, timeout=5)
+                except Exception as e:
+                    LOGGER.warning(f"Failed to dispose browser context: {str(e)}")
+                    self.retiring = True
+
+    async def _capture_clip(self, session_id, width, options):
+        if options.get("selector"):
+            result = await self.connection.send("Runtime.evaluate", {
+                "expression": ELEMENT_BOUNDS_SCRIPT % json.dumps(options["selector"]),
+                "returnByValue": True
+            }, session_id=session_id)
+            bounds = result.get("result", {}).get("value")
+            if not bounds or bounds["width"] <= 0 or bounds["height"] <= 0:
+                raise SelectorNotFound(f"No visible element matches selector: {options['selector']}")
+            return {
+                "x": bounds["x"],
+                "y": bounds["y"],
+                "width": bounds["width"],
+                "height": min(bounds["height"], MAX_FULL_PAGE_HEIGHT),
+                "scale": 1
+            }
+        if options.get("full_page"):
+            metrics = await self.connection.send("Page.getLayoutMetrics", session_id=session_id)
+            content = metrics.get("cssContentSize") or metrics.get("contentSize", {})
+            return {
+                "x": 0,
+                "y": 0,
+                "width": max(content.get("width", width), width),
+                "height": min(content.get("height", 0), MAX_FULL_PAGE_HEIGHT) or 1,
+                "scale": 1
+            }
+        return None
+
+    def kill(self):
+        if self.process is not None and self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), 5)
+            except asyncio.TimeoutError:
+                self.kill()
+                await self.process.wait()
+        if self.stderr_task is not None:
+            self.stderr_task.cancel()
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+        LOGGER.info(f"Browser worker {self.index} stopped after {self.captures} captures")
+
+class BrowserPool:
+    def __init__(self, find_executable: Callable[[], Optional[str]], size: int = 2, tabs_per_browser: int = 1, max_captures: int = 50):
+        self.find_executable = find_executable
+        self.size = size
+        self.tabs_per_browser = tabs_per_browser
+        self.max_captures = max_captures
+        self.workers: List[BrowserWorker] = []
+        self.starting = 0
+        self.waiting = 0
+        self.counter = itertools.count(1)
+        self.condition = None
+        self.loop = None
+        self.recycled = 0
+        self.failures = 0
+        atexit.register(self.kill_all)
+
+    def _condition(self):
+        loop = asyncio.get_running_loop()
+        if self.condition is None or self.loop is not loop:
+            self.loop = loop
+            self.condition = asyncio.Condition()
+            self.workers = [worker for worker in self.workers if worker.alive]
+            self.starting = 0
+        return self.condition
+
+    def _idle_slot(self):
+        candidates = [
+            worker for worker in self.workers
+            if worker.alive and not worker.retiring and worker.active < self.tabs_per_browser
+        ]
+        return min(candidates, key=lambda worker: worker.active) if candidates else None
+
+    async def acquire(self) -> BrowserWorker:
+        condition = self._condition()
+        async with condition:
+            self.waiting += 1
+            try:
+                while True:
+                    self._reap()
+                    worker = self._idle_slot()
+                    if worker is not None:
+                        worker.active += 1
+                        if worker.captures + worker.active >= self.max_captures:
+                            worker.retiring = True
+                        return worker
+                    if len(self.workers) + self.starting < self.size:
+                        break
+                    await condition.wait()
+            finally:
+                self.waiting -= 1
+            self.starting += 1
+        executable = self.find_executable()
+        try:
+            if not executable:
+                raise CDPError("No browser found on system")
+            worker = self._make_worker(executable)
+            await worker.start()
+        except BaseException:
+            async with condition:
+                self.starting -= 1
+                self.failures += 1
+                condition.notify_all()
+            raise
+        async with condition:
+            self.starting -= 1
+            worker.active += 1
+            self.workers.append(worker)
+            condition.notify_all()
+        return worker
+
+    def _reap(self):
+        for worker in [worker for worker in self.workers if not worker.alive and not worker.active]:
+            self.workers.remove(worker)
+            self.recycled += 1
+            asyncio.ensure_future(worker.close())
+
+    def _make_worker(self, executable):
+        return BrowserWorker(executable, next(self.counter))
+
+    async def release(self, worker: BrowserWorker):
+        condition = self._condition()
+        async with condition:
+            worker.active -= 1
+            if not worker.alive or worker.captures >= self.max_captures:
+                worker.retiring = True
+            retire = worker.retiring and worker.active == 0
+            if retire and worker in self.workers:
+                self.workers.remove(worker)
+            condition.notify_all()
+        if retire:
+            self.recycled += 1
+            await worker.close()
+
+    async def capture(self, url, width, height, load_timeout=20, options=None):
+        worker = await self.acquire()
+        try:
+            return await worker.capture(url, width, height, load_timeout, options)
+        finally:
+            await asyncio.shield(self.release(worker))
+
+    def kill_all(self):
+        for worker in self.workers:
+            worker.kill()
+
+    async def close(self):
+        workers, self.workers = self.workers, []
+        await asyncio.gather(*[worker.close() for worker in workers], return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "browsers": len(self.workers),
+            "starting": self.starting,
+            "active_tabs": sum(worker.active for worker in self.workers),
+            "waiting": self.waiting,
+            "size": self.size,
+            "tabs_per_browser": self.tabs_per_browser,
+            "recycled": self.recycled,
+            "start_failures": self.failures
+        }
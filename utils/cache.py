@@ -0,0 +1,393 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+from .logger import LOGGER
+
+def hash_key(key) -> str:
+    if not isinstance(key, (bytes, bytearray)):
+        key = str(key).encode("utf-8")
+    return hashlib.sha256(key).hexdigest()
+
+class SingleFlight:
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key) -> bool:
+        return key in self.calls
+
+    async def run(self, key, func, *args, **kwargs):
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self.calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            task.exception()
+
+class TTLCache:
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        item = self.entries.get(key)
+        if item is None or (item[1] is not None and item[1] <= time.time()):
+            if item is not None:
+                del self.entries[key]
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def set(self, key, value, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def expires_at(self, key) -> Optional[float]:
+        item = self.entries.get(key)
+        return item[1] if item else None
+
+    def pop(self, key, default=None):
+        item = self.entries.pop(key, None)
+        return item[0] if item else default
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+class SQLiteKV:
+    def __init__(self, path, name: str = "kv"):
+        self.name = name
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL, updated REAL NOT NULL)"
+        )
+        self.hits = 0
+        self.misses = 0
+        self.purge_expired()
+
+    def get(self, key, default=None) -> Any:
+        with self.lock:
+            row = self.conn.execute("SELECT value, expires FROM kv WHERE key = ?", (str(key),)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def get_entries(self, keys) -> Dict[str, tuple]:
+        keys = [str(key) for key in keys]
+        found = {}
+        now = time.time()
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT key, value, expires FROM kv WHERE key IN ({placeholders})", batch
+                ).fetchall()
+            for key, value, expires in rows:
+                if expires is None or expires > now:
+                    found[key] = (json.loads(value), expires)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get_many(self, keys) -> Dict[str, Any]:
+        return {key: value for key, (value, _) in self.get_entries(keys).items()}
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict, ttl: Optional[float] = None):
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+        rows = [(str(key), json.dumps(value), expires, now) for key, value in items.items()]
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO kv (key, value, expires, updated) VALUES (?, ?, ?, ?)", rows)
+
+    def delete(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM kv WHERE key = ?", (str(key),))
+
+    def purge_expired(self) -> int:
+        with self.lock:
+            removed = self.conn.execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)).rowcount
+        if removed:
+            LOGGER.info(f"Purged {removed} expired {self.name} entries")
+        return removed
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+class TieredCache:
+    def __init__(self, path, name: str = "cache", max_entries: int = 4096, ttl: Optional[float] = None):
+        self.name = name
+        self.ttl = ttl
+        self.memory = TTLCache(max_entries=max_entries)
+        self.store = SQLiteKV(path, name=name)
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def _memory_many(self, keys):
+        missing = object()
+        found = {}
+        remaining = []
+        for key in keys:
+            value = self.memory.get(key, missing)
+            if value is missing:
+                remaining.append(key)
+            else:
+                found[key] = value
+        return found, remaining
+
+    def _promote(self, found, entries):
+        for key, (value, expires) in entries.items():
+            self.memory.set(key, value, expires_at=expires)
+            found[key] = value
+        return found
+
+    def get_many(self, keys) -> Dict[str, Any]:
+        found, remaining = self._memory_many(keys)
+        if remaining:
+            self._promote(found, self.store.get_entries(remaining))
+        return found
+
+    async def get_many_async(self, keys) -> Dict[str, Any]:
+        found, remaining = self._memory_many(keys)
+        if remaining:
+            self._promote(found, await asyncio.to_thread(self.store.get_entries, remaining))
+        return found
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        self.store.set(key, value, ttl=ttl)
+
+    def set_many(self, items: Dict, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        for key, value in items.items():
+            self.memory.set(key, value, ttl=ttl)
+        self.store.set_many(items, ttl=ttl)
+
+    def __contains__(self, key):
+        missing = object()
+        return self.get(key, missing) is not missing
+
+    def stats(self) -> Dict:
+        return {"memory": self.memory.stats(), "persistent": self.store.stats()}
+
+class DiskCache:
+    def __init__(self, directory, max_bytes: int, name: str = "cache"):
+        self.name = name
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / "blobs"
+        self.index_dir = self.directory / "index"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.blob_refs: Dict[str, int] = {}
+        self.blob_sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        records = []
+        for index_file in self.index_dir.glob("*.json"):
+            try:
+                with open(index_file, "r") as f:
+                    record = json.load(f)
+                records.append((record.get("used", 0), index_file.stem, record))
+            except Exception:
+                index_file.unlink(missing_ok=True)
+        for _, digest, record in sorted(records):
+            blob_path = self.blob_dir / record["blob"]
+            if not blob_path.exists():
+                (self.index_dir / f"{digest}.json").unlink(missing_ok=True)
+                continue
+            self._retain(record["blob"], blob_path.stat().st_size)
+            self.entries[digest] = record
+        for blob_path in self.blob_dir.iterdir():
+            if blob_path.name not in self.blob_refs:
+                blob_path.unlink(missing_ok=True)
+        self._evict()
+        if self.entries:
+            LOGGER.info(f"Loaded {len(self.entries)} {self.name} entries ({self.total_bytes} bytes)")
+
+    def _retain(self, blob, size):
+        if blob not in self.blob_refs:
+            self.blob_refs[blob] = 0
+            self.blob_sizes[blob] = size
+            self.total_bytes += size
+        self.blob_refs[blob] += 1
+
+    def _unlink(self, digest):
+        record = self.entries.pop(digest, None)
+        if record is None:
+            return
+        (self.index_dir / f"{digest}.json").unlink(missing_ok=True)
+        blob = record["blob"]
+        self.blob_refs[blob] -= 1
+        if self.blob_refs[blob] <= 0:
+            del self.blob_refs[blob]
+            self.total_bytes -= self.blob_sizes.pop(blob, 0)
+            (self.blob_dir / blob).unlink(missing_ok=True)
+
+    def _write_index(self, digest, record):
+        index_path = self.index_dir / f"{digest}.json"
+        tmp_path = self.index_dir / f".{digest}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, index_path)
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            digest = next(iter(self.entries))
+            self._unlink(digest)
+            self.evictions += 1
+
+    def path_for_blob(self, blob) -> Path:
+        return self.blob_dir / blob
+
+    def get(self, key) -> Optional[Dict]:
+        return self.get_by_digest(hash_key(key))
+
+    def get_by_digest(self, digest) -> Optional[Dict]:
+        record = self.entries.get(digest)
+        if record is None or not (self.blob_dir / record["blob"]).exists():
+            if record is not None:
+                self._unlink(digest)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(digest)
+        record["used"] = time.time()
+        self.hits += 1
+        return {**record, "digest": digest, "path": str(self.blob_dir / record["blob"])}
+
+    def read(self, key) -> Optional[bytes]:
+        record = self.get(key)
+        if record is None:
+            return None
+        try:
+            with open(record["path"], "rb") as f:
+                return f.read()
+        except OSError:
+            self.discard(key)
+            return None
+
+    def store_blob(self, data: bytes):
+        blob = hashlib.sha256(data).hexdigest()
+        blob_path = self.blob_dir / blob
+        if not blob_path.exists():
+            tmp_path = self.blob_dir / f".{blob}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, blob_path)
+        return blob, len(data)
+
+    def store_blob_file(self, src_path):
+        digest = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        blob = digest.hexdigest()
+        blob_path = self.blob_dir / blob
+        size = os.path.getsize(src_path)
+        if blob_path.exists():
+            os.remove(src_path)
+        else:
+            os.replace(src_path, blob_path)
+        return blob, size
+
+    def put(self, key, data: bytes, meta: Optional[Dict] = None) -> Dict:
+        return self.commit(key, *self.store_blob(data), meta)
+
+    def put_file(self, key, src_path, meta: Optional[Dict] = None) -> Dict:
+        return self.commit(key, *self.store_blob_file(src_path), meta)
+
+    def commit(self, key, blob, size, meta: Optional[Dict] = None) -> Dict:
+        digest = hash_key(key)
+        now = time.time()
+        record = {"key": str(key), "blob": blob, "size": size, "meta": meta or {}, "stored": now, "used": now}
+        self._retain(blob, size)
+        self._unlink(digest)
+        self._evict()
+        self.entries[digest] = record
+        self._write_index(digest, record)
+        return {**record, "digest": digest, "path": str(self.blob_dir / blob)}
+
+    def update_meta(self, key, **meta):
+        digest = hash_key(key)
+        record = self.entries.get(digest)
+        if record is None:
+            return
+        record["meta"].update(meta)
+        record["stored"] = time.time()
+        self._write_index(digest, record)
+
+    def discard(self, key):
+        self._unlink(hash_key(key))
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self.entries),
+            "blobs": len(self.blob_refs),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
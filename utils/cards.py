@@ -0,0 +1,81 @@
+import os
+from typing import Dict, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .imaging import image_initializer
+from .logger import LOGGER
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts")
+FONT_FILES = {
+    "regular": "DejaVuSans.ttf",
+    "bold": "DejaVuSans-Bold.ttf"
+}
+CARD_FONT_SPECS = {
+    "bold_large": ("bold", 120),
+    "bold": ("bold", 40),
+    "regular": ("regular", 38),
+    "small": ("regular", 36)
+}
+CARD_SIZE = (1200, 600)
+CARD_BACKGROUND = (30, 39, 50)
+CARD_WHITE = (255, 255, 255)
+CARD_LIGHT_GRAY = (200, 200, 200)
+
+CARD_FONTS: Optional[Dict] = None
+CARD_BASE_LAYER: Optional[Image.Image] = None
+
+def load_card_fonts():
+    fonts = {}
+    for name, (face, size) in CARD_FONT_SPECS.items():
+        path = os.path.join(FONT_DIR, FONT_FILES[face])
+        try:
+            fonts[name] = ImageFont.truetype(path, size)
+        except OSError as e:
+            LOGGER.error(f"Failed to load bundled font {path}: {str(e)}")
+            fonts[name] = ImageFont.load_default()
+    return fonts
+
+def render_base_layer(fonts):
+    img = Image.new("RGB", CARD_SIZE, color=CARD_BACKGROUND)
+    draw = ImageDraw.Draw(img)
+    draw.text((40, 40), "Current Weather", font=fonts["bold"], fill=CARD_WHITE)
+
+    icon_x, icon_y = 320, 230
+    for i in range(3):
+        y = icon_y + i * 15
+        draw.line([(icon_x, y), (icon_x + 60, y)], fill=CARD_LIGHT_GRAY, width=5)
+    return img
+
+@image_initializer
+def load_card_assets():
+    global CARD_FONTS, CARD_BASE_LAYER
+    if CARD_BASE_LAYER is None:
+        CARD_FONTS = load_card_fonts()
+        CARD_BASE_LAYER = render_base_layer(CARD_FONTS)
+
+def create_weather_image(card, output_path):
+    load_card_assets()
+    current = card["current"]
+    fonts = CARD_FONTS
+
+    img = CARD_BASE_LAYER.copy()
+    draw = ImageDraw.Draw(img)
+
+    temp_text = f"{current['temperature']}°C"
+    condition_text = current["weather"]
+    realfeel_text = f"RealFeel® {current['feels_like']}°C"
+    location_text = f"{card['city']}, {card['country_name']}"
+
+    draw.text((1140, 30), card["time_text"], font=fonts["regular"], fill=CARD_LIGHT_GRAY, anchor="ra")
+
+    temp_x, temp_y = 500, 180
+    draw.text((temp_x, temp_y), temp_text, font=fonts["bold_large"], fill=CARD_WHITE)
+    draw.text((temp_x + 30, temp_y + 130), condition_text, font=fonts["regular"], fill=CARD_LIGHT_GRAY)
+    draw.text((temp_x + 10, temp_y + 180), realfeel_text, font=fonts["small"], fill=CARD_LIGHT_GRAY)
+    draw.text((40, 520), location_text, font=fonts["regular"], fill=CARD_LIGHT_GRAY)
+
+    tmp_path = f"{output_path}.tmp"
+    img.save(tmp_path, format="PNG")
+    os.replace(tmp_path, output_path)
+    return output_path
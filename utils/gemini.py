@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional, Union
+
+import aiohttp
+
+from .cache import SingleFlight, hash_key
+from .http import SharedSession
+from .logger import LOGGER
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+GEMINI_TIMEOUT = 30
+GEMINI_MAX_RETRIES = 3
+GEMINI_BACKOFF_BASE = 0.5
+GEMINI_BACKOFF_MAX = 8
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class GeminiError(Exception):
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+class GeminiClient:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.0-flash",
+        concurrency: int = GEMINI_CONCURRENCY,
+        timeout: float = GEMINI_TIMEOUT,
+        max_retries: int = GEMINI_MAX_RETRIES
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.http = SharedSession(limit=concurrency * 2, limit_per_host=concurrency, timeout=timeout)
+        self.flights = SingleFlight()
+        self.semaphore = None
+        self.loop = None
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self.semaphore
+
+    @staticmethod
+    def build_payload(
+        parts: Union[str, List[Dict]],
+        system_instruction: Optional[str] = None,
+        generation_config: Optional[Dict] = None
+    ) -> Dict:
+        if isinstance(parts, str):
+            parts = [{"text": parts}]
+        payload = {"contents": [{"role": "user", "parts": parts}]}
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        return payload
+
+    async def generate(
+        self,
+        parts: Union[str, List[Dict]],
+        system_instruction: Optional[str] = None,
+        generation_config: Optional[Dict] = None,
+        model: Optional[str] = None
+    ) -> str:
+        model = model or self.model
+        payload = self.build_payload(parts, system_instruction, generation_config)
+        key = hash_key(f"{model}|{json.dumps(payload, sort_keys=True)}")
+        if self.flights.in_flight(key):
+            self.coalesced += 1
+        return await self.flights.run(key, self._request, model, payload)
+
+    def _backoff(self, attempt, retry_after=None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), GEMINI_BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(GEMINI_BACKOFF_BASE * 2 ** attempt, GEMINI_BACKOFF_MAX))
+
+    async def _request(self, model, payload) -> str:
+        url = f"{GEMINI_BASE_URL}/{model}:generateContent"
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+        attempt = 0
+        while True:
+            retry_after = None
+            self.requests += 1
+            started = time.monotonic()
+            try:
+                async with self._limiter():
+                    async with self.http.get().post(url, json=payload, headers=headers) as response:
+                        if response.status == 200:
+                            try:
+                                return self.extract_text(await response.json(content_type=None))
+                            except (aiohttp.ContentTypeError, ValueError, AttributeError) as e:
+                                error = GeminiError(f"Invalid response body from Gemini: {str(e)}", 502)
+                        else:
+                            retry_after = response.headers.get("Retry-After")
+                            try:
+                                error = await response.json(content_type=None)
+                                message = error.get("error", {}).get("message", "Unknown error")
+                            except (aiohttp.ContentTypeError, ValueError):
+                                message = await response.text()
+                            error = GeminiError(message, response.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = GeminiError(str(e) or "Gemini request timed out", 504 if isinstance(e, asyncio.TimeoutError) else 502)
+            if error.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                self.failures += 1
+                LOGGER.error(f"Gemini {model} request failed: {error.status} - {str(error)}")
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            self.retries += 1
+            LOGGER.warning(f"Gemini {model} returned {error.status} after {time.monotonic() - started:.2f}s, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def extract_text(result: Dict) -> str:
+        candidates = result.get("candidates") or []
+        if not candidates:
+            reason = result.get("promptFeedback", {}).get("blockReason")
+            raise GeminiError(f"No candidates returned{f' ({reason})' if reason else ''}", 502)
+        parts = candidates[0].get("content", {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+    async def close(self):
+        await self.http.close()
+
+    def stats(self) -> Dict:
+        return {
+            "model": self.model,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failures": self.failures
+        }
@@ -0,0 +1,36 @@
+import asyncio
+from typing import Dict, Optional
+
+import aiohttp
+
+class SharedSession:
+    def __init__(self, limit: int = 100, limit_per_host: int = 20, timeout: float = 30, headers: Optional[Dict] = None, **options):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.headers = headers
+        self.options = options
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.loop = None
+
+    def get(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.loop is not loop:
+            self.loop = loop
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+                **self.options
+            )
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
@@ -0,0 +1,76 @@
+import asyncio
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+from PIL import Image
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+SAVE_OPTIONS = {
+    "png": {"optimize": True},
+    "jpeg": {"optimize": True, "progressive": True},
+    "webp": {"method": 4}
+}
+
+IMAGE_START_METHOD = os.getenv(
+    "IMAGE_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+IMAGE_INITIALIZERS: List[Callable[[], None]] = []
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def image_initializer(func):
+    if func not in IMAGE_INITIALIZERS:
+        IMAGE_INITIALIZERS.append(func)
+    return func
+
+def init_image_worker(initializers):
+    for initializer in initializers:
+        initializer()
+
+def image_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context(IMAGE_START_METHOD),
+            initializer=init_image_worker,
+            initargs=(tuple(IMAGE_INITIALIZERS),)
+        )
+    return _executor
+
+def fit_size(size, width: Optional[int], height: Optional[int]):
+    src_width, src_height = size
+    scale = min(
+        width / src_width if width else 1,
+        height / src_height if height else 1,
+        1
+    )
+    return max(1, round(src_width * scale)), max(1, round(src_height * scale))
+
+def resize_image(src: str, dst: str, width: Optional[int], height: Optional[int], image_format: str, quality: int = 80) -> int:
+    with Image.open(src) as image:
+        target = fit_size(image.size, width, height)
+        if target != image.size:
+            image = image.resize(target, Image.LANCZOS, reducing_gap=3.0)
+        if image_format == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        options = dict(SAVE_OPTIONS.get(image_format, {}))
+        if image_format in ("jpeg", "webp"):
+            options["quality"] = quality
+        tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+        try:
+            image.save(tmp_path, format=image_format.upper(), **options)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, dst)
+    return os.path.getsize(dst)
+
+async def resize_image_async(src: str, dst: str, width: Optional[int], height: Optional[int], image_format: str, quality: int = 80) -> int:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(image_executor(), resize_image, src, dst, width, height, image_format, quality)
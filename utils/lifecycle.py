@@ -0,0 +1,31 @@
+from contextlib import asynccontextmanager
+
+from .logger import LOGGER
+
+STARTUP_HOOKS = []
+SHUTDOWN_HOOKS = []
+
+def on_startup(func):
+    if func not in STARTUP_HOOKS:
+        STARTUP_HOOKS.append(func)
+    return func
+
+def on_shutdown(func):
+    if func not in SHUTDOWN_HOOKS:
+        SHUTDOWN_HOOKS.append(func)
+    return func
+
+async def run_hooks(hooks, phase):
+    for hook in hooks:
+        try:
+            await hook()
+        except Exception as e:
+            LOGGER.error(f"{phase} hook {hook.__module__}.{hook.__name__} failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app):
+    await run_hooks(STARTUP_HOOKS, "Startup")
+    try:
+        yield
+    finally:
+        await run_hooks(list(reversed(SHUTDOWN_HOOKS)), "Shutdown")
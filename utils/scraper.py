@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .logger import LOGGER
+
+try:
+    import cloudscraper
+    CLOUDSCRAPER_AVAILABLE = True
+except ImportError:
+    cloudscraper = None
+    CLOUDSCRAPER_AVAILABLE = False
+    LOGGER.warning("Cloudscraper not installed - Cloudflare bypass unavailable")
+
+SCRAPER_MAX_USES = 200
+SCRAPER_MAX_AGE = 1800
+SCRAPER_MAX_FAILURES = 3
+HOST_STATE_TTL = 1500
+
+def is_challenge(response) -> bool:
+    if response.status_code not in (403, 429, 503):
+        return False
+    if response.headers.get("cf-mitigated") == "challenge":
+        return True
+    return "cloudflare" in response.headers.get("server", "").lower()
+
+class ScraperSession:
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.created = time.monotonic()
+        self.uses = 0
+        self.failures = 0
+
+    def healthy(self) -> bool:
+        return (
+            self.failures < SCRAPER_MAX_FAILURES
+            and self.uses < SCRAPER_MAX_USES
+            and time.monotonic() - self.created < SCRAPER_MAX_AGE
+        )
+
+    def close(self):
+        try:
+            self.scraper.close()
+        except Exception:
+            pass
+
+class ScraperPool:
+    def __init__(self, name: str, browser: Dict, size: int = 4, warm: int = 1):
+        self.name = name
+        self.browser = browser
+        self.size = size
+        self.warm_count = min(warm, size)
+        self.idle = deque()
+        self.hosts: Dict[str, Dict] = {}
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"scraper-{name}")
+        self.semaphore = None
+        self.loop = None
+        self.warming = None
+        self.created = 0
+        self.retired = 0
+        self.requests = 0
+        self.failures = 0
+        self.challenges = 0
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.size)
+            self.warming = None
+        if self.warming is None and len(self.idle) < self.warm_count:
+            self.warming = loop.create_task(self._warm())
+
+    def _create(self) -> ScraperSession:
+        scraper = cloudscraper.create_scraper(browser=self.browser)
+        self.created += 1
+        return ScraperSession(scraper)
+
+    async def _warm(self):
+        try:
+            while len(self.idle) < self.warm_count:
+                session = await self.loop.run_in_executor(self.executor, self._create)
+                self.idle.append(session)
+            LOGGER.info(f"Warmed {len(self.idle)} {self.name} scraper sessions")
+        except Exception as e:
+            LOGGER.warning(f"Failed to warm {self.name} scraper sessions: {str(e)}")
+
+    async def _checkout(self) -> ScraperSession:
+        while self.idle:
+            session = self.idle.popleft()
+            if session.healthy():
+                return session
+            self._retire(session)
+        return await self.loop.run_in_executor(self.executor, self._create)
+
+    def _checkin(self, session: ScraperSession):
+        if session.healthy() and len(self.idle) < self.size:
+            self.idle.append(session)
+        else:
+            self._retire(session)
+
+    def _retire(self, session: ScraperSession):
+        self.retired += 1
+        self.executor.submit(session.close)
+
+    def _host_state(self, host) -> Optional[Dict]:
+        state = self.hosts.get(host)
+        if state and time.monotonic() - state["updated"] > HOST_STATE_TTL:
+            del self.hosts[host]
+            return None
+        return state
+
+    def _apply_host_state(self, session: ScraperSession, host):
+        state = self._host_state(host)
+        if state is None:
+            return
+        session.scraper.headers["User-Agent"] = state["user_agent"]
+        for cookie in state["cookies"]:
+            session.scraper.cookies.set_cookie(cookie)
+
+    def _save_host_state(self, session: ScraperSession, host):
+        cookies = [
+            cookie for cookie in session.scraper.cookies
+            if host == cookie.domain.lstrip(".") or host.endswith("." + cookie.domain.lstrip("."))
+        ]
+        if cookies:
+            self.hosts[host] = {
+                "cookies": cookies,
+                "user_agent": session.scraper.headers.get("User-Agent"),
+                "updated": time.monotonic()
+            }
+
+    def has_cookies(self, url) -> bool:
+        return self._host_state(urlsplit(url).hostname or "") is not None
+
+    async def request(self, method: str, url: str, **kwargs):
+        if not CLOUDSCRAPER_AVAILABLE:
+            raise RuntimeError("cloudscraper is not installed")
+        self._bind()
+        host = urlsplit(url).hostname or ""
+        async with self.semaphore:
+            session = await self._checkout()
+            self._apply_host_state(session, host)
+            session.uses += 1
+            self.requests += 1
+            try:
+                response = await self.loop.run_in_executor(
+                    self.executor,
+                    lambda: session.scraper.request(method, url, **kwargs)
+                )
+            except Exception:
+                session.failures += 1
+                self.failures += 1
+                self._checkin(session)
+                raise
+            if is_challenge(response):
+                session.failures += 1
+                self.challenges += 1
+                self.hosts.pop(host, None)
+            else:
+                session.failures = 0
+                self._save_host_state(session, host)
+            self._checkin(session)
+            return response
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def warm(self):
+        if not CLOUDSCRAPER_AVAILABLE:
+            return
+        self._bind()
+        if self.warming is not None:
+            await self.warming
+
+    async def close(self):
+        if self.warming is not None and not self.warming.done():
+            self.warming.cancel()
+        while self.idle:
+            self.idle.popleft().close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        return {
+            "available": CLOUDSCRAPER_AVAILABLE,
+            "size": self.size,
+            "idle": len(self.idle),
+            "hosts": len(self.hosts),
+            "created": self.created,
+            "retired": self.retired,
+            "requests": self.requests,
+            "failures": self.failures,
+            "challenges": self.challenges
+        }
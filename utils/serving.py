@@ -0,0 +1,148 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import quote
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+def file_etag(stat_result) -> str:
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    weak = etag[2:] if etag.startswith("W/") else etag
+    return any(tag == etag or tag == weak or tag == f"W/{weak}" for tag in candidates)
+
+def not_modified(request: Request, etag: str, mtime: Optional[float] = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and mtime is not None:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def parse_range(header: str, size: int):
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec or "," in spec:
+        return None
+    match = RANGE_PATTERN.match(spec)
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if length == 0:
+            return ()
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return ()
+    return start, end
+
+def content_disposition(filename: str, disposition: str = "attachment") -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+async def iter_file_range(path: str, start: int, end: int):
+    remaining = end - start + 1
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def serve_file(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    max_age: int = 0,
+    immutable: bool = False
+) -> Response:
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    cache_control = f"public, max-age={max(int(max_age), 0)}"
+    if immutable:
+        cache_control += ", immutable"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control
+    }
+    if filename:
+        headers["Content-Disposition"] = content_disposition(filename)
+    if not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    range_header = request.headers.get("range")
+    if range_header:
+        if_range = request.headers.get("if-range")
+        if if_range is None or if_range.strip() in (etag, last_modified):
+            byte_range = parse_range(range_header, size)
+            if byte_range == ():
+                headers["Content-Range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is not None:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                headers["Content-Length"] = str(end - start + 1)
+                return StreamingResponse(
+                    iter_file_range(path, start, end),
+                    status_code=206,
+                    media_type=media_type,
+                    headers=headers
+                )
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+def precompress_json(content) -> Dict:
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return {
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    }
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def serve_payload(request: Request, payload: Dict, media_type: str = "application/json", max_age: int = 0) -> Response:
+    headers = {
+        "ETag": payload["etag"],
+        "Cache-Control": f"public, max-age={max(int(max_age), 0)}",
+        "Vary": "Accept-Encoding"
+    }
+    if not_modified(request, payload["etag"]):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=payload["gzip"], media_type=media_type, headers=headers)
+    return Response(content=payload["body"], media_type=media_type, headers=headers)